@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
+from starx.loader import load_dataset
+from starx.ui import share
 
+# Copy-on-write lets the shared data store hand out frames to the sessions as cheap views
+pd.set_option('mode.copy_on_write', True)
 
 
 st.title("StarX")
@@ -44,12 +48,12 @@ st.write("- Filters to customize data views.")
 st.markdown("## Data Acquisition")
 st.write("'Data acquisition', i.e., loading the dataset, will be implemented in this script.")
 
-# Load the CSV file into a DataFrame
+# Load the CSV file into a DataFrame (parsed once, then served from the shared cache)
 file_path = 'data/Quikr_car.csv' 
-df = pd.read_csv(file_path)
+df = load_dataset(file_path)
 
-# This stores the data frame in the session state
-st.session_state.original_df = df
+# This stores a view of the shared data frame in the session state
+st.session_state.original_df = share('original_df', df)
 
 
 #This is a Custom Styling
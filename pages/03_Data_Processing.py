@@ -1,5 +1,7 @@
 import streamlit as st
-import plotly.express as px
+from starx.plotting import scatter
+from starx.quantiles import cached_outlier_filter
+from starx.ui import data_grid, share
 
 # Check if both 'original_df' and 'df_transformed' exist in session state
 if 'original_df' in st.session_state and 'df_transformed' in st.session_state:
@@ -12,40 +14,46 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state:
 
     st.header("Removing outliers")
     df_transformed = st.session_state.df_transformed
-    df_processed = df_transformed.copy() # Creates a copy of the transformed dataset
 
-    # Remove rows that are more than 99 percentile for Kms_driven
-    df_processed = df_processed[df_processed['Kms_driven'] <= df_processed['Kms_driven'].quantile(0.99)]
+    # Percentiles above which rows are removed
+    cols = st.columns(2)
+    kms_percentile = cols[0].slider("Kms_driven percentile", min_value=90.0, max_value=100.0, value=99.0, step=0.5, format="%.1f%%")
+    price_percentile = cols[1].slider("Price percentile", min_value=90.0, max_value=100.0, value=98.0, step=0.5, format="%.1f%%")
+
+    # The thresholds come from streaming quantile sketches, which also work on data that is processed in chunks
+    outlier_filter = cached_outlier_filter(df_transformed, {"Kms_driven": kms_percentile / 100, "Price": price_percentile / 100})
+    thresholds = outlier_filter.thresholds()
 
-    # Remove rows that are more than 99 percentile for Price
-    df_processed = df_processed[df_processed['Price'] <= df_processed['Price'].quantile(0.98)]
+    # Remove rows above the selected percentiles of Kms_driven and Price
+    df_processed = outlier_filter.transform(df_transformed)
+    st.write(f"Rows with more than {thresholds['Kms_driven']:,.0f} Kms driven or a price above ₹{thresholds['Price']:,.0f} are removed.")
 
     st.write("### Processed DataFrame after outliers removal")
-    st.dataframe(df_processed)
+    data_grid(df_processed, key="processed")
 
     st.markdown("### Graph of Years against Kms_Driven for Processed Data")
-    st.plotly_chart(px.scatter(df_processed, x ='Year', y='Kms_driven'))
+    st.plotly_chart(scatter(df_processed, 'Year', 'Kms_driven'))
     st.write("This scatter plot shows the relationship between years and kilometers driven, with outliers removed, revealing a clearer trend of decreasing kilometers for newer cars.")
 
     st.markdown("### Graph of Years against Price for Processed Data")
-    st.plotly_chart(px.scatter(df_processed, x ='Year', y='Price'))
+    st.plotly_chart(scatter(df_processed, 'Year', 'Price'))
     st.write("This scatter plot shows a positive trend, where newer cars tend to have higher prices, reflecting their increased value over time.")
 
     cols = st.columns(2)
     cols[0].markdown("## Transformed data")
-    cols[0].dataframe(df_transformed)
+    data_grid(df_transformed, key="transformed", container=cols[0])
     cols[0].write("###### Unprocessed data that has outliers")
     cols[0].markdown("### Data metrics")
     cols[0].dataframe(df_transformed.describe())
 
     cols[1].markdown("## Processed data")
-    cols[1].dataframe(df_processed)
+    data_grid(df_processed, key="processed_side", container=cols[1])
     cols[1].write("###### Processed data with outliers removed")
     cols[1].markdown("### Processed Data metrics")
     cols[1].dataframe(df_processed.describe())
 
-    st.write("In total, 32 outliers were removed. Removal of these rows had little impact on the mean, but more impact on the Max values of the Kms_driven and Price")
-    st.session_state["df_processed"] = df_processed
+    st.write(f"In total, {len(df_transformed) - len(df_processed)} outliers were removed. Removal of these rows had little impact on the mean, but more impact on the Max values of the Kms_driven and Price")
+    st.session_state["df_processed"] = share("df_processed", df_processed)
 
 
 else:
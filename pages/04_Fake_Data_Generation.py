@@ -1,9 +1,8 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import streamlit as st
-import random
-import copy
+from starx.fakedata import DEFAULT_ROWS
+from starx.synth import cached_generator
+from starx.ui import data_grid, share
 
 # Check if 'original_df', 'df_transformed', and 'df_processed' exist in session state
 if 'original_df' in st.session_state and 'df_transformed' in st.session_state and 'df_processed' in st.session_state:
@@ -15,51 +14,48 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
         st.markdown("# Fake Data Generator")
         
         st.markdown("### Data Randomization")
-        st.write("This page generates synthetic data by randomly creating rows based on the ranges and patterns observed in the original dataset.")
+        st.write("This page generates synthetic data by randomly creating rows based on the ranges and patterns observed in the original dataset. The Gaussian copula keeps the frequency of every value and the relations between columns, such as newer cars being more expensive.")
 
-        st.write("Click on the button below to create a random dataset")
+        st.write("Choose the number of rows and a seed, or click the button to create a new random dataset")
         
         # Loads the processed data from the session state
-        df_processed = st.session_state.df_processed.copy()
+        df_processed = st.session_state.df_processed
         
             
-        # Generate random data based on the cleaned dataset
-        PRICE_MIN = df_processed['Price'].min()
-        PRICE_MAX = df_processed['Price'].max()
-        KMS_MIN = df_processed['Kms_driven'].min()
-        KMS_MAX = df_processed['Kms_driven'].max()
-        YEAR_MIN = df_processed['Year'].min()
-        YEAR_MAX = df_processed['Year'].max()
-        
-        def random_car_data():
-            """Generate a random row based on the dataset statistics."""
-            return {
-                "Label": random.randint(0, 1),  # Random binary label
-                "Location": random.randint(1, 40),  # Random numeric location
-                "Price": random.randint(PRICE_MIN, PRICE_MAX),
-                "Kms_driven": random.randint(KMS_MIN, KMS_MAX),
-                "Fuel_type": random.randint(1, 7),  # Random fuel type (numeric)
-                "Owner": random.randint(0, 3),  # Random owner count
-                "Year": random.randint(YEAR_MIN, YEAR_MAX),
-                "Company": random.randint(1, 25),  # Random company as numeric
-            }
-        
-        df_randomized = pd.DataFrame([random_car_data() for _ in range(500)]) # Creates a randomized dataset
-        st.session_state["df_randomized"] = df_randomized
-            
-        if st.button("Randomize Data"):
-            df_randomized = pd.DataFrame([random_car_data() for _ in range(500)]) # Creates a randomized dataset
-            st.session_state["df_randomized"] = df_randomized # Updates the data in the session state
+        # The copula follows the frequencies and correlations of the processed data, the uniform
+        # generator draws every column independently between its minimum and maximum
+        methods = {"Gaussian copula": "copula", "Uniform": "uniform"}
+        method = st.radio("Generator", list(methods), horizontal=True)
+        generator = cached_generator(methods[method], df_processed, st.session_state.encoder)
+
+        # Number of rows and seed of the fake dataset; the button moves on to the next seed
+        if "fake_seed" not in st.session_state:
+            st.session_state.fake_seed = 0
+
+        def next_seed():
+            st.session_state.fake_seed += 1
+
+        settings = st.columns([2, 2, 1])
+        rows = settings[0].number_input("Rows", min_value=1, max_value=5_000_000, value=DEFAULT_ROWS, step=500)
+        seed = settings[1].number_input("Seed", min_value=0, step=1, key="fake_seed")
+        settings[2].button("Randomize Data", on_click=next_seed)
+
+        # The data is only generated again when the generator, row count or seed change
+        params = (generator.key, rows, seed)
+        if st.session_state.get("fake_params") != params or "df_randomized" not in st.session_state:
+            df_randomized = generator.sample(rows, seed=seed) # Creates a randomized dataset
+            st.session_state["df_randomized"] = share("df_randomized", df_randomized)
+            st.session_state["fake_params"] = params
+        df_randomized = st.session_state.df_randomized
 
-            
         cols = st.columns(2)
         cols[0].markdown("### Original Processed Data")
-        cols[0].dataframe(df_processed)
+        data_grid(df_processed, key="processed", container=cols[0])
         cols[0].markdown("### Data metrics")
         cols[0].dataframe(df_processed.describe())
 
         cols[1].markdown("### Fake Data")
-        cols[1].dataframe(st.session_state.df_randomized)
+        data_grid(df_randomized, key="randomized", container=cols[1])
         cols[1].markdown("### Fake Data metrics")
         cols[1].dataframe(df_randomized.describe())
         
@@ -1,9 +1,10 @@
 import streamlit as st
-import pandas as pd
 import altair as alt
-from sklearn.linear_model import Ridge, Lasso, LinearRegression
-from sklearn.model_selection import cross_val_score
-import numpy as np
+from starx.jobs import JOBS
+from starx.selection import compare_models, comparison_key
+from starx.subsets import subset_key, subset_search
+from starx.tuning import alpha_search, search_key
+from starx.ui import wait_for_jobs
 
 
 
@@ -15,70 +16,31 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
     st.markdown(st.session_state["custom_style"], unsafe_allow_html=True)
 
     # Load the DataFrame from session state
-    df_processed = st.session_state.df_processed.copy()
+    df_processed = st.session_state.df_processed
 
     # Check and ensure that required columns exist
     required_columns = ['Price', 'Kms_driven']  # Replace with actual column names
     if not all(col in df_processed.columns for col in required_columns):
         st.error(f"The required columns {required_columns} are not in the DataFrame. Available columns: {df_processed.columns.tolist()}")
     else:
-        # Extract features and target (ensure correct column names from your dataset)
-        X = df_processed[['Kms_driven']].values  # Replace 'Kms_driven' with your actual feature column name
-        y = df_processed['Price'].values    # Replace 'Price' with your actual target column name
-
-        # Normalize features to highlight model differences
-        X_mean = X.mean()
-        X_std = X.std()
-        X_normalized = (X - X_mean) / X_std
-
-        # Models
-        ridge_model = Ridge(alpha=1.0)
-        lasso_model = Lasso(alpha=0.1)
-        linear_model = LinearRegression()
-
-        # Train models
-        ridge_model.fit(X_normalized, y)
-        lasso_model.fit(X_normalized, y)
-        linear_model.fit(X_normalized, y)
-
-        # Predictions and scores
-        y_pred_ridge = ridge_model.predict(([[50000]] - X_mean) / X_std)  # Normalize input
-        y_pred_lasso = lasso_model.predict(([[50000]] - X_mean) / X_std)  # Normalize input
-        y_pred_linear = linear_model.predict(([[50000]] - X_mean) / X_std)  # Normalize input
-
-        ridge_score = ridge_model.score(X_normalized, y)
-        ridge_cv_scores = cross_val_score(ridge_model, X_normalized, y, cv=5)
-
-        lasso_score = lasso_model.score(X_normalized, y)
-        lasso_cv_scores = cross_val_score(lasso_model, X_normalized, y, cv=5)
-
-        linear_score = linear_model.score(X_normalized, y)
-        linear_cv_scores = cross_val_score(linear_model, X_normalized, y, cv=5)
-
-        # Layout for Ridge Regression Feedback
-        st.success("✅ The Ridge Regression model is trained!")
-        st.write(f"**Y_pred (Ridge)**: {y_pred_ridge[0]}")
-        st.write(f"**Ridge regression score**: {ridge_score:.3f}")
-        st.write(f"**Ridge regression cross_val_scores**: {ridge_cv_scores}")
-
-        # Layout for Lasso Feedback
-        st.success("✅ The Lasso model is trained!")
-        st.write(f"**Y_pred (Lasso)**: {y_pred_lasso[0]}")
-        st.write(f"**Lasso score**: {lasso_score:.3f}")
-        st.write(f"**Lasso cross_val_scores**: {lasso_cv_scores}")
-
-        # Layout for Linear Regression Feedback
-        st.success("✅ The Linear Regression model is trained!")
-        st.write(f"**Y_pred (Linear Regression)**: {y_pred_linear[0]}")
-        st.write(f"**Linear Regression score**: {linear_score:.3f}")
-        st.write(f"**Linear Regression cross_val_scores**: {linear_cv_scores}")
+        # Cross-validates all models in a background job; the results are reused until the data changes.
+        # The jobs run in a process per core already, so they do not start parallel workers of their own
+        comparison = JOBS.submit(comparison_key(df_processed, ['Kms_driven'], target='Price'),
+                                 compare_models, df_processed, ['Kms_driven'], 'Price', n_jobs=1)
+        if not comparison.done():
+            wait_for_jobs(["the model comparison"], action="Running")
+        scores, models = comparison.result()
+
+        # Layout of the feedback of every model, with its prediction for a car with 50,000 km
+        for _, row in scores.iterrows():
+            y_pred = models[row['Model']].predict([[50000]])
+            st.success(f"✅ The {row['Model']} model is trained!")
+            st.write(f"**Y_pred ({row['Model']})**: {y_pred[0]}")
+            st.write(f"**{row['Model']} score**: {row['Score']:.3f}")
+            st.write(f"**{row['Model']} cross_val_scores**: {row['CV scores']}")
 
         # Adding Comparison Chart
-        chart_data = pd.DataFrame({
-            'Model': ['Ridge Regression', 'Lasso Regression', 'Linear Regression'],
-            'Test R²': [ridge_score, lasso_score, linear_score],
-            'Mean CV R²': [ridge_cv_scores.mean(), lasso_cv_scores.mean(), linear_cv_scores.mean()]
-        })
+        chart_data = scores[['Model', 'Score', 'Mean CV R²']].rename(columns={'Score': 'Test R²'})
 
         st.markdown("### R² Scores Comparison")
 
@@ -98,6 +60,55 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
 
         st.altair_chart(chart)
 
+        # Hyperparameter search: validation error of Ridge and Lasso over a grid of 100 alphas
+        st.markdown("### Hyperparameter Search")
+        st.write("Ridge is scored with its exact leave-one-out error, which follows from a single SVD for all alphas. "
+                 "Lasso is scored with 5-fold cross-validation along a warm-started regularization path.")
+        numeric_columns = df_processed.select_dtypes(include="number").columns.drop('Price')
+        search_features = st.multiselect("Features for the search:", numeric_columns, default=['Kms_driven'])
+
+        if search_features:
+            # Runs in a background job like the model comparison
+            search = JOBS.submit(search_key(df_processed, search_features, target='Price'),
+                                 alpha_search, df_processed, search_features, 'Price', n_jobs=1)
+            if not search.done():
+                wait_for_jobs(["the hyperparameter search"], action="Running")
+            errors, seconds = search.result()
+            best = errors.loc[errors.groupby('Model')['MSE'].idxmin()].set_index('Model')
+            best['Seconds'] = best.index.map(seconds)
+            st.dataframe(best.rename(columns={'alpha': 'Best alpha', 'MSE': 'Validation MSE'}))
+
+            error_chart = alt.Chart(errors).mark_line().encode(
+                x=alt.X('alpha:Q', title="alpha", scale=alt.Scale(type='log')),
+                y=alt.Y('MSE:Q', title="Validation MSE", scale=alt.Scale(zero=False)),
+                color=alt.Color('Model:N', title="Model"),
+                tooltip=['Model:N', 'alpha:Q', 'MSE:Q']
+            ).properties(
+                width=600,
+                height=400,
+                title="Validation Error vs. alpha"
+            )
+            st.altair_chart(error_chart)
+
+        # Feature subset search: cross-validated R² of linear regression on subsets of the features
+        st.markdown("### Feature Subset Search")
+        st.write("The Gram matrix of every fold is computed once, after which each candidate subset is scored "
+                 "without going over the rows again.")
+        subset_method = st.radio("Search method:", ["Forward", "Backward", "Exhaustive"], horizontal=True)
+        subset_features = st.multiselect("Candidate features:", numeric_columns, default=list(numeric_columns))
+
+        if subset_features:
+            subset_job = JOBS.submit(subset_key(df_processed, subset_features, target='Price', method=subset_method.lower()),
+                                     subset_search, df_processed, subset_features, 'Price', subset_method.lower(),
+                                     n_jobs=1)
+            if not subset_job.done():
+                wait_for_jobs(["the feature subset search"], action="Running")
+            subsets, stats = subset_job.result()
+            st.dataframe(subsets.sort_values('Mean CV R²', ascending=False), hide_index=True)
+            st.caption(f"{stats['Candidates']} candidate subsets scored in {stats['Search seconds']:.3f}s "
+                       f"({stats['Seconds per candidate'] * 1e6:,.0f}µs per candidate), "
+                       f"after {stats['Precompute seconds']:.3f}s to compute the Gram matrices.")
+
     # Adding Final Selection Option
     selected_model = st.selectbox(
         "Select your preferred model based on the scores:",
@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
 import seaborn as sns
-from sklearn.linear_model import Lasso, Ridge, LinearRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error
 import matplotlib.pyplot as plt
-import pickle
-import os
+from starx.inference import entry_predictor, latency
+from starx.persistence import save_model
+from starx.plotting import stratified_sample
+from starx.prediction_cache import PREDICTIONS
+from starx.ui import wait_for_jobs
+from starx.training import (FEATURES, benchmark_table, boosting_models, fitted_design, price_models, split_data,
+                            submit_price_models)
 
 
 # Check if 'original_df', 'df_transformed', and 'df_processed' exist in session state
@@ -15,64 +17,11 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
     # Apply the style on every page
     st.markdown(st.session_state["custom_style"], unsafe_allow_html=True)
 
-    # Mapping for Fuel Types
-    fuel_type_mapping = {
-        1: "Petrol",
-        2: "Diesel",
-        3: "CNG",
-        4: "Electric",
-        5: "Petrol + CNG",
-        6: "LPG",
-        7: "Hybrid"
-    }
-    reverse_fuel_type_mapping = {v: k for k, v in fuel_type_mapping.items()}
-
-    # Mapping for Owner Types
-    owner_mapping = {
-        "1st Owner": 1,
-        "2nd Owner": 2,
-        "3rd Owner": 3
-    }
-    reverse_owner_mapping = {v: k for k, v in owner_mapping.items()}
-
-    # Mapping for Companies
-    company_mapping = {
-        "Maruti": 1,
-        "Hyundai": 2,
-        "Honda": 3,
-        "Ford": 4,
-        "Tata": 5,
-        "Renault": 6,
-        "Mahindra": 7,
-        "Toyota": 8,
-        "MG": 9,
-        "Volkswagen": 10,
-        "Jeep": 11,
-        "Kia": 12,
-        "BMW": 13,
-        "Skoda": 14,
-        "Nissan": 15,
-        "Audi": 16,
-        "Datsun": 17,
-        "Mercedes": 18,
-        "Fiat": 19,
-        "Volvo": 20,
-        "Jaguar": 21,
-        "SsangYong": 22,
-        "Land Rover": 23,
-        "Porsche": 24
-    }
-    reverse_company_mapping = {v: k for k, v in company_mapping.items()}
+    # The encoder learned in the Data Transformation page maps the category values to their codes
+    encoder = st.session_state.encoder
 
     # Load the DataFrame from session state
-    df_processed = st.session_state.df_processed.copy()
-
-    # Ensure proper data types and map descriptive names
-    df_processed['Fuel_type'] = df_processed['Fuel_type'].astype(int)
-    df_processed['Fuel_type_label'] = df_processed['Fuel_type'].map(fuel_type_mapping)
-    df_processed['Owner'] = df_processed['Owner'].astype(int)
-    df_processed['Owner_label'] = df_processed['Owner'].map(reverse_owner_mapping)
-    df_processed['Company_label'] = df_processed['Company'].map(reverse_company_mapping)
+    df_processed = st.session_state.df_processed
 
     # Title and description
     st.title("Car Price Prediction")
@@ -81,16 +30,17 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
     # Sidebar for inputs
     st.sidebar.header("Input Features")
     year = st.sidebar.slider("Year", int(df_processed["Year"].min()), int(df_processed["Year"].max()), 2017)
-    location = st.sidebar.selectbox("Location", sorted(df_processed["Location"].unique()))
-    company_label = st.sidebar.selectbox("Company", list(company_mapping.keys()))
-    fuel_type_label = st.sidebar.radio("Fuel Type", list(fuel_type_mapping.values()), index=0)
+    location_label = st.sidebar.selectbox("Location", encoder.vocabulary["Location"])
+    company_label = st.sidebar.selectbox("Company", encoder.vocabulary["Company"])
+    fuel_type_label = st.sidebar.radio("Fuel Type", encoder.vocabulary["Fuel_type"], index=0)
     kms_driven = st.sidebar.slider("Kms Driven", int(df_processed["Kms_driven"].min()), int(df_processed["Kms_driven"].max()), 40000)
-    owner_label = st.sidebar.radio("Owner Type", sorted(owner_mapping.keys()), index=0)
+    owner_label = st.sidebar.radio("Owner Type", encoder.vocabulary["Owner"], index=0)
 
-    # Convert selected fuel type, owner type, and company back to numeric values
-    fuel_type = reverse_fuel_type_mapping[fuel_type_label]
-    owner = owner_mapping[owner_label]
-    company = company_mapping[company_label]
+    # Convert selected location, fuel type, owner type, and company to their codes
+    location = encoder.encode_value("Location", location_label)
+    fuel_type = encoder.encode_value("Fuel_type", fuel_type_label)
+    owner = encoder.encode_value("Owner", owner_label)
+    company = encoder.encode_value("Company", company_label)
 
     # Display input features in the main page
     st.header("\U0001F527 Adjust Input Features")
@@ -98,7 +48,7 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
     with col1:
         st.write("### Selected Features")
         st.write(f"- **Year:** {year}")
-        st.write(f"- **Location:** {location}")
+        st.write(f"- **Location:** {location_label}")
         st.write(f"- **Company:** {company_label}")
         st.write(f"- **Fuel Type:** {fuel_type_label}")
         st.write(f"- **Kms Driven:** {kms_driven}")
@@ -114,48 +64,58 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
         format="%d%%"
     )
 
-    # Prepare data for prediction
-    X = pd.get_dummies(df_processed[["Location", "Kms_driven", "Fuel_type", "Owner", "Year", "Company"]], drop_first=True)
-    y = df_processed["Price"]
-
-    # Train-test split (60% train, 40% test)
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_train_split/100, random_state=42)
-
-    # Reindex the input data to match columns in X
-    input_data = pd.DataFrame([[location, kms_driven, fuel_type, owner, year, company]], 
-                            columns=["Location", "Kms_driven", "Fuel_type", "Owner", "Year", "Company"])
-    input_data = pd.get_dummies(input_data, drop_first=True).reindex(columns=X.columns, fill_value=0)
+    # The gradient boosting engine adds a non-linear model next to the linear ones
+    engine = st.radio("Engine", ["Linear models", "Gradient boosting"], horizontal=True)
+    candidates = price_models()
+    if engine == "Gradient boosting":
+        candidates.update(boosting_models())
+
+    # Trained models come from the model registry; missing ones are trained in background jobs
+    # and the page reruns until they are ready
+    models, pending = submit_price_models(df_processed, test_train_split/100, candidates)
+    wait_for_jobs(pending, done=len(models))
+    X_train, X_test, y_train, y_test = split_data(df_processed, test_train_split/100)
+    design = fitted_design(df_processed)
+
+    # The selected listing, as category codes and numbers
+    listing = {"Location": location, "Kms_driven": kms_driven, "Fuel_type": fuel_type, "Owner": owner,
+               "Year": year, "Company": company}
+
+    # Prices come from the prediction cache shared by all sessions, keyed by the registry key of the model.
+    # On a miss the linear models score the listing with their compiled predictors, without building a DataFrame
+    def cached_price(name, predict=None):
+        entry = models[name]
+        return PREDICTIONS.get_or_predict(entry.key, listing, predict or entry_predictor(entry, design).predict)
 
     # Lasso Regression
-    lasso_model = Lasso(alpha=0.1)
-    lasso_model.fit(X_train, y_train)
-    lasso_pred = lasso_model.predict(X_test)
-    lasso_mse = mean_squared_error(y_test, lasso_pred)
-    lasso_pred_input = lasso_model.predict(input_data)[0]
+    lasso_model = models["Lasso Regression"].model
+    lasso_mse = models["Lasso Regression"].meta["mse"]
+    lasso_pred_input = cached_price("Lasso Regression")
 
     # Ridge Regression
-    ridge_model = Ridge(alpha=1.0)
-    ridge_model.fit(X_train, y_train)
-    ridge_pred = ridge_model.predict(X_test)
-    ridge_mse = mean_squared_error(y_test, ridge_pred)
-    ridge_pred_input = ridge_model.predict(input_data)[0]
+    ridge_model = models["Ridge Regression"].model
+    ridge_mse = models["Ridge Regression"].meta["mse"]
+    ridge_pred_input = cached_price("Ridge Regression")
 
     # Linear Regression
-    linear_model = LinearRegression()
-    linear_model.fit(X_train, y_train)
-    linear_pred = linear_model.predict(X_test)
-    linear_mse = mean_squared_error(y_test, linear_pred)
-    linear_pred_input = linear_model.predict(input_data)[0]
-
-    # Save the trained linear model to the 'models/' directory
-    models_directory = 'models'
-    if not os.path.exists(models_directory):
-        os.makedirs(models_directory)  # Create 'models/' directory if it doesn't exist
-
-    # Save the model
-    model_path = os.path.join(models_directory, 'linear_model.pkl')
-    with open(model_path, 'wb') as model_file:
-        pickle.dump(linear_model, model_file)
+    linear_model = models["Linear Regression"].model
+    linear_mse = models["Linear Regression"].meta["mse"]
+    linear_pred_input = cached_price("Linear Regression")
+
+    # Gradient Boosting, which takes the listing columns with their category codes
+    if "Gradient Boosting" in models:
+        boosting_mse = models["Gradient Boosting"].meta["mse"]
+        boosting_model = models["Gradient Boosting"].model
+        boosting_pred_input = cached_price("Gradient Boosting",
+                                           lambda listing: boosting_model.predict(pd.DataFrame([listing], columns=FEATURES))[0])
+
+    # Publish the trained linear model for the chatbot, once for every newly selected model.
+    # It is saved together with the encoder, so predictions use the same category codes.
+    # Its version is derived from its content, so publishing the same model from a new session changes nothing
+    linear_key = models["Linear Regression"].key
+    if st.session_state.get("published_model") != linear_key:
+        save_model(linear_model, design, encoder)
+        st.session_state["published_model"] = linear_key
 
     # def predict_price(kms_driven, year, owner):
     #     # Prepare the input data
@@ -181,6 +141,11 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
         st.info(f"Predicted Price (Ridge): ₹{ridge_pred_input:,.2f}")
         st.success(f"Predicted Price (Linear): ₹{linear_pred_input:,.2f}")
         st.warning(f"Predicted Price (Lasso): ₹{lasso_pred_input:,.2f}")
+        if "Gradient Boosting" in models:
+            st.info(f"Predicted Price (Gradient Boosting): ₹{boosting_pred_input:,.2f}")
+        cache = PREDICTIONS.stats()
+        st.caption(f"Prices are for the Kms driven rounded to {PREDICTIONS.kms_resolution:,} km. Prediction cache: "
+                   f"{cache['Hits']:,} hits, {cache['Misses']:,} misses ({cache['Hit rate']:.0%} hit rate).")
     
     
 
@@ -191,13 +156,25 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
         st.metric("Lasso Regression MSE", f"{lasso_mse:.2f}")
         st.metric("Ridge Regression MSE", f"{ridge_mse:.2f}")
         st.metric("Linear Regression MSE", f"{linear_mse:.2f}")
+        if "Gradient Boosting" in models:
+            st.metric("Gradient Boosting MSE", f"{boosting_mse:.2f}")
 
     
     with col4:
-        st.metric("Training Samples", f"{len(X_train)}")
-        st.metric("Test Samples", f"{len(X_test)}")
+        st.metric("Training Samples", f"{X_train.shape[0]}")
+        st.metric("Test Samples", f"{X_test.shape[0]}")
+
+        # The model with the lowest test MSE fits the data best
+        best_model = min(models, key=lambda name: models[name].meta["mse"])
+        st.info(f" {best_model} MSE : {models[best_model].meta['mse']:.2f}, The lowest MSE indicating it fits the data slightly better than the other models.")
 
-        st.info(f" Ridge Regression MSE : {ridge_mse:.2f}, The lowest MSE indicating it fits the data slightly better than other two models.")
+    # Benchmark of the trained models: accuracy, training cost and single-listing predict latency
+    st.subheader("Model Benchmark")
+    st.dataframe(benchmark_table(models).style.format({"Test MSE": "{:.3e}", "Fit time (ms)": "{:.1f}",
+                                                       "Predict latency (µs)": "{:.0f}"}))
+    # The listing above is scored with the compiled predictor instead of the model's predict
+    p50, p99 = latency(entry_predictor(models["Linear Regression"], design).predict, [listing], calls=1000)
+    st.caption(f"Compiled predictor of the Linear Regression model: p50 {p50:.1f}µs, p99 {p99:.1f}µs per listing.")
 
 
     # Visualization: Kms Driven vs. Price with Predictions Highlighted
@@ -206,12 +183,15 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
 
     fig, ax = plt.subplots(figsize=(8, 6))
 
-    # Scatter plot using X_test and y_test
+    # Scatter plot using X_test and y_test, thinned to a stratified sample on large test sets
+    test_points = stratified_sample(pd.DataFrame({"Kms_driven": df_processed.loc[y_test.index, 'Kms_driven'], "Price": y_test}), "Kms_driven")
     sns.scatterplot(
-        x=X_test['Kms_driven'],  # Assuming 'Kms_driven' is a column in X_test
-        y=y_test,                # The target variable from the test set
+        x=test_points['Kms_driven'],
+        y=test_points['Price'],
         ax=ax
     )
+    if len(test_points) < len(y_test):
+        st.caption(f"Showing a stratified sample of {len(test_points):,} of {len(y_test):,} test rows.")
 
     # Highlight the predicted price for Lasso and Ridge
     # ax.scatter(
@@ -1,19 +1,21 @@
 import streamlit as st
 import pandas as pd
 import seaborn as sns
-from sklearn.linear_model import Lasso, Ridge, LinearRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error
 import matplotlib.pyplot as plt
+from starx.inference import entry_predictor
+from starx.plotting import stratified_sample
+from starx.prediction_cache import PREDICTIONS
+from starx.training import fitted_design, split_data, submit_price_models
+from starx.ui import data_grid, share, wait_for_jobs
 
 # Check if 'original_df', 'df_transformed', and 'df_processed' exist in session state
 if 'original_df' in st.session_state and 'df_transformed' in st.session_state and 'df_processed' in st.session_state:
     # Apply the style on every page
     st.markdown(st.session_state["custom_style"], unsafe_allow_html=True)
 
-    # Copy the original processed and randomized DataFrames
-    df_processed = st.session_state.df_processed.copy()
-    df_random = st.session_state.df_randomized.copy()
+    # Load the original processed and randomized DataFrames
+    df_processed = st.session_state.df_processed
+    df_random = st.session_state.df_randomized
 
     # Title
     st.title("Predictions on Augmented Data")
@@ -32,21 +34,21 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
     num_fake_rows = int(len(df_processed) * (fake_data_percentage / 100))
 
     # Select the required number of rows from the random DataFrame
-    df_fake = df_random.sample(n=num_fake_rows, random_state=42)
+    df_fake = df_random.sample(n=num_fake_rows, replace=len(df_random) < num_fake_rows, random_state=42)
 
     # Create the augmented DataFrame
     df_augmented = pd.concat([df_processed, df_fake]).reset_index(drop=True)
 
     # Display the augmented DataFrame
     st.write("## Augmented DataFrame:")
-    st.dataframe(df_augmented)
+    data_grid(df_augmented, key="augmented")
     st.write(" This is a dataframe that contains both the original data, and fake data added to it's end.")
 
     # Shuffle the rows
 
     # Store the sugmented data in the session
 
-    st.session_state.df_augmented = df_augmented
+    st.session_state.df_augmented = share("df_augmented", df_augmented)
 
 
 
@@ -56,78 +58,26 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
     # Apply the style on every page
     st.markdown(st.session_state["custom_style"], unsafe_allow_html=True)
 
-    # Mapping for Fuel Types
-    fuel_type_mapping = {
-        1: "Petrol",
-        2: "Diesel",
-        3: "CNG",
-        4: "Electric",
-        5: "Petrol + CNG",
-        6: "LPG",
-        7: "Hybrid"
-    }
-    reverse_fuel_type_mapping = {v: k for k, v in fuel_type_mapping.items()}
-
-    # Mapping for Owner Types
-    owner_mapping = {
-        "1st Owner": 1,
-        "2nd Owner": 2,
-        "3rd Owner": 3
-    }
-    reverse_owner_mapping = {v: k for k, v in owner_mapping.items()}
-
-    # Mapping for Companies
-    company_mapping = {
-        "Maruti": 1,
-        "Hyundai": 2,
-        "Honda": 3,
-        "Ford": 4,
-        "Tata": 5,
-        "Renault": 6,
-        "Mahindra": 7,
-        "Toyota": 8,
-        "MG": 9,
-        "Volkswagen": 10,
-        "Jeep": 11,
-        "Kia": 12,
-        "BMW": 13,
-        "Skoda": 14,
-        "Nissan": 15,
-        "Audi": 16,
-        "Datsun": 17,
-        "Mercedes": 18,
-        "Fiat": 19,
-        "Volvo": 20,
-        "Jaguar": 21,
-        "SsangYong": 22,
-        "Land Rover": 23,
-        "Porsche": 24
-    }
-    reverse_company_mapping = {v: k for k, v in company_mapping.items()}
+    # The encoder learned in the Data Transformation page maps the category values to their codes
+    encoder = st.session_state.encoder
 
     # Load the DataFrame from session state
-    df_augmented = st.session_state.df_augmented.copy()
-
-    # Ensure proper data types and map descriptive names
-    df_augmented['Fuel_type'] = df_augmented['Fuel_type'].astype(int)
-    df_augmented['Fuel_type_label'] = df_augmented['Fuel_type'].map(fuel_type_mapping)
-    df_augmented['Owner'] = df_augmented['Owner'].astype(int)
-    df_augmented['Owner_label'] = df_augmented['Owner'].map(reverse_owner_mapping)
-    df_augmented['Company_label'] = df_augmented['Company'].map(reverse_company_mapping)
+    df_augmented = st.session_state.df_augmented
 
     # Sidebar for inputs
     st.sidebar.header("Input Features")
     year = st.sidebar.slider("Year", int(df_augmented["Year"].min()), int(df_augmented["Year"].max()), 2017)
-    location = st.sidebar.selectbox("Location", sorted(df_augmented["Location"].unique()))
-    company_label = st.sidebar.selectbox("Company", list(company_mapping.keys()))
-    fuel_type_label = st.sidebar.radio("Fuel Type", list(fuel_type_mapping.values()), index=0)
+    location_label = st.sidebar.selectbox("Location", encoder.vocabulary["Location"])
+    company_label = st.sidebar.selectbox("Company", encoder.vocabulary["Company"])
+    fuel_type_label = st.sidebar.radio("Fuel Type", encoder.vocabulary["Fuel_type"], index=0)
     kms_driven = st.sidebar.slider("Kms Driven", int(df_augmented["Kms_driven"].min()), int(df_augmented["Kms_driven"].max()), 40000)
-    owner_label = st.sidebar.radio("Owner Type", sorted(owner_mapping.keys()), index=0)
+    owner_label = st.sidebar.radio("Owner Type", encoder.vocabulary["Owner"], index=0)
 
-    # Convert selected fuel type, owner type, and company back to numeric values
-    fuel_type = reverse_fuel_type_mapping[fuel_type_label]
-    owner = owner_mapping[owner_label]
-    company = company_mapping[company_label]
+    # Convert selected location, fuel type, owner type, and company to their codes
+    location = encoder.encode_value("Location", location_label)
+    fuel_type = encoder.encode_value("Fuel_type", fuel_type_label)
+    owner = encoder.encode_value("Owner", owner_label)
+    company = encoder.encode_value("Company", company_label)
 
     # Display input features in the main page
     st.header("\U0001F527 Adjusting Input Features")
@@ -135,7 +85,7 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
     with col1:
         st.write("### Selected Features")
         st.write(f"- **Year:** {year}")
-        st.write(f"- **Location:** {location}")
+        st.write(f"- **Location:** {location_label}")
         st.write(f"- **Company:** {company_label}")
         st.write(f"- **Fuel Type:** {fuel_type_label}")
         st.write(f"- **Kms Driven:** {kms_driven}")
@@ -150,38 +100,37 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
         step=1,
         format="%d%%"
     )
-    # Prepare data for prediction
-    X = pd.get_dummies(df_augmented[["Location", "Kms_driven", "Fuel_type", "Owner", "Year", "Company"]], drop_first=True)
-    y = df_augmented["Price"]
-
-    # Train-test split (60% train, 40% test)
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_train_split/100, random_state=42)
-
-    # Reindex the input data to match columns in X
-    input_data = pd.DataFrame([[location, kms_driven, fuel_type, owner, year, company]], 
-                            columns=["Location", "Kms_driven", "Fuel_type", "Owner", "Year", "Company"])
-    input_data = pd.get_dummies(input_data, drop_first=True).reindex(columns=X.columns, fill_value=0)
+    # Trained models come from the model registry; missing ones are trained in background jobs
+    # and the page reruns until they are ready
+    models, pending = submit_price_models(df_augmented, test_train_split/100)
+    wait_for_jobs(pending, done=len(models))
+    X_train, X_test, y_train, y_test = split_data(df_augmented, test_train_split/100)
+    design = fitted_design(df_augmented)
+
+    # The selected listing, as category codes and numbers
+    listing = {"Location": location, "Kms_driven": kms_driven, "Fuel_type": fuel_type, "Owner": owner,
+               "Year": year, "Company": company}
+
+    # Prices come from the prediction cache shared by all sessions, keyed by the registry key of the model.
+    # On a miss the linear models score the listing with their compiled predictors, without building a DataFrame
+    def cached_price(name, predict=None):
+        entry = models[name]
+        return PREDICTIONS.get_or_predict(entry.key, listing, predict or entry_predictor(entry, design).predict)
 
     # Lasso Regression
-    lasso_model = Lasso(alpha=0.1)
-    lasso_model.fit(X_train, y_train)
-    lasso_pred = lasso_model.predict(X_test)
-    lasso_mse = mean_squared_error(y_test, lasso_pred)
-    lasso_pred_input = lasso_model.predict(input_data)[0]
+    lasso_model = models["Lasso Regression"].model
+    lasso_mse = models["Lasso Regression"].meta["mse"]
+    lasso_pred_input = cached_price("Lasso Regression")
 
     # Ridge Regression
-    ridge_model = Ridge(alpha=1.0)
-    ridge_model.fit(X_train, y_train)
-    ridge_pred = ridge_model.predict(X_test)
-    ridge_mse = mean_squared_error(y_test, ridge_pred)
-    ridge_pred_input = ridge_model.predict(input_data)[0]
+    ridge_model = models["Ridge Regression"].model
+    ridge_mse = models["Ridge Regression"].meta["mse"]
+    ridge_pred_input = cached_price("Ridge Regression")
 
     # Linear Regression
-    linear_model = LinearRegression()
-    linear_model.fit(X_train, y_train)
-    linear_pred = linear_model.predict(X_test)
-    linear_mse = mean_squared_error(y_test, linear_pred)
-    linear_pred_input = linear_model.predict(input_data)[0]
+    linear_model = models["Linear Regression"].model
+    linear_mse = models["Linear Regression"].meta["mse"]
+    linear_pred_input = cached_price("Linear Regression")
 
 
 
@@ -191,6 +140,9 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
         st.success(f"Predicted Price (Lasso): ₹{lasso_pred_input:,.2f}")
         st.info(f"Predicted Price (Ridge): ₹{ridge_pred_input:,.2f}")
         st.warning(f"Predicted Price (Linear): ₹{linear_pred_input:,.2f}")
+        cache = PREDICTIONS.stats()
+        st.caption(f"Prices are for the Kms driven rounded to {PREDICTIONS.kms_resolution:,} km. Prediction cache: "
+                   f"{cache['Hits']:,} hits, {cache['Misses']:,} misses ({cache['Hit rate']:.0%} hit rate).")
 
     # Model performance metrics
     st.header("\U0001F4CA Model Performance")
@@ -200,11 +152,13 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
         st.metric("Ridge Regression MSE", f"{ridge_mse:.2f}")
         st.metric("Linear Regression MSE", f"{linear_mse:.2f}")
     with col4:
-        st.warning(f" Linear Regression MSE : {linear_mse:.2f}, After adding fake data Ridge Regression has the lowest MSE ,  indicating it fits the data.")
+        # The model with the lowest test MSE fits the data best
+        best_model = min(models, key=lambda name: models[name].meta["mse"])
+        st.warning(f" {best_model} MSE : {models[best_model].meta['mse']:.2f}, After adding fake data {best_model} has the lowest MSE ,  indicating it fits the data best.")
 
         
-        st.metric("Training Samples", f"{len(X_train)}")
-        st.metric("Test Samples", f"{len(X_test)}")
+        st.metric("Training Samples", f"{X_train.shape[0]}")
+        st.metric("Test Samples", f"{X_test.shape[0]}")
         
 
     # Visualization: Kms Driven vs. Price with Predictions Highlighted
@@ -213,12 +167,15 @@ if 'original_df' in st.session_state and 'df_transformed' in st.session_state an
 
     fig, ax = plt.subplots(figsize=(8, 6))
 
-    # Scatter plot using X_test and y_test
+    # Scatter plot using X_test and y_test, thinned to a stratified sample on large test sets
+    test_points = stratified_sample(pd.DataFrame({"Kms_driven": df_augmented.loc[y_test.index, 'Kms_driven'], "Price": y_test}), "Kms_driven")
     sns.scatterplot(
-        x=X_test['Kms_driven'],  # Assuming 'Kms_driven' is a column in X_test
-        y=y_test,                # The target variable from the test set
+        x=test_points['Kms_driven'],
+        y=test_points['Price'],
         ax=ax
     )
+    if len(test_points) < len(y_test):
+        st.caption(f"Showing a stratified sample of {len(test_points):,} of {len(y_test):,} test rows.")
 
     # Highlight the predicted price for Lasso and Ridge
     # ax.scatter(
@@ -1,13 +1,10 @@
 import streamlit as st
-import pickle
-import pandas as pd
-import os
+from starx.inference import cached_predictor
+from starx.persistence import read_version
+from starx.prediction_cache import PREDICTIONS
 
-# Path to the model
-model_path = 'models/linear_model.pkl'
-
-# Check if the model file exists
-if os.path.exists(model_path):
+# Check if a model has been published by the Model Training page
+if read_version() is not None:
     class Chatbot:
         def __init__(self):
             self.state = "default"
@@ -198,14 +195,13 @@ if os.path.exists(model_path):
 
 
         def load_model(self):
-            model_path = 'models/linear_model.pkl'
-            with open(model_path, 'rb') as model_file:
-                model = pickle.load(model_file)
-            return model
+            # Compiles the published model again only when a newer version has been saved
+            model = cached_predictor()
+            return model, model.encoder
 
         # Function to process car purchase and predict price
-        def process_car_purchase(self, kms_driven, owners, year, location=2, fuel_type=1, company=16):
-            model = self.load_model()
+        def process_car_purchase(self, kms_driven, owners, year, location="Chennai", fuel_type="Petrol", company="Audi"):
+            model, encoder = self.load_model()
             
             try:
                 # Convert inputs to appropriate types
@@ -217,19 +213,16 @@ if os.path.exists(model_path):
                 if kms_driven <= 0 or owners <= 0 or year < 1900 or year > 2025:
                     return "Invalid input values. Please provide realistic data."
                 
-                # Prepare input data
-                input_data = pd.DataFrame([[location, kms_driven, fuel_type, owners, year, company]],
-                                        columns=["Location", "Kms_driven", "Fuel_type", "Owner", "Year", "Company"])
-                
-                # One-hot encode the input data and ensure it matches the model's feature names
-                X = pd.get_dummies(input_data, drop_first=True)
-                for col in model.feature_names_in_:
-                    if col not in X.columns:
-                        X[col] = 0  # Add missing columns with default value
-                X = X[model.feature_names_in_]
-                
-                # Predict the price using the loaded model
-                predicted_price = model.predict(X)[0]
+                # Convert the categories to the codes the model was trained with
+                location = encoder.encode_value("Location", location)
+                fuel_type = encoder.encode_value("Fuel_type", fuel_type)
+                company = encoder.encode_value("Company", company)
+
+                # Predict the price using the compiled model, which takes the listing as a plain dict.
+                # Listings priced before with the same model version are served from the shared prediction cache
+                listing = {"Location": location, "Kms_driven": kms_driven, "Fuel_type": fuel_type,
+                           "Owner": owners, "Year": year, "Company": company}
+                predicted_price = PREDICTIONS.get_or_predict(model.version, listing, model.predict)
                 
                 # Sanity check for negative predictions
                 if predicted_price < 0:
@@ -0,0 +1,28 @@
+import streamlit as st
+from starx.store import STORE
+from starx.ui import session_id
+
+
+# Check if 'original_df' exists in session state
+if 'original_df' in st.session_state:
+    # Apply the style on every page
+    st.markdown(st.session_state["custom_style"], unsafe_allow_html=True)
+
+    st.title("Memory Usage")
+    st.write("The data frames of all pipeline stages are kept in a store shared by every session. Sessions working on the same data share a single copy of each stage.")
+
+    st.metric("Total memory of stored data frames", f"{STORE.total_bytes() / 1e6:,.2f} MB")
+
+    # Memory per stored data frame
+    st.header("Memory per stage")
+    st.dataframe(STORE.stage_report())
+    st.write("A data frame used by several stages or sessions is stored only once. 'MB before' is the size of the data frame before its columns were downcast to the smallest data types that hold their values.")
+
+    # Memory per session
+    st.header("Memory per session")
+    st.dataframe(STORE.session_report())
+    st.write(f"Your session is **{session_id()[:8]}**. 'Own MB' counts the data frames that only this session uses.")
+
+else:
+    # Error message if 'original_df' does not exist
+    st.error("Error: The app must be started again, or the pages must be launched in the correct order.")
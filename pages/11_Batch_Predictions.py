@@ -0,0 +1,75 @@
+import os
+import re
+import streamlit as st
+import pandas as pd
+from starx.batch import BATCH_ROWS, score_file
+from starx.persistence import read_version
+
+
+# Listings on the server are only read from the data directory, and the predictions are only written to the
+# predictions directory
+DATA_DIR = "data"
+OUTPUT_DIR = "predictions"
+
+
+def inside(directory, path):
+    # Resolve symbolic links and ".." so a path cannot leave the directory
+    directory, path = os.path.realpath(directory), os.path.realpath(path)
+    return os.path.commonpath([directory, path]) == directory
+
+
+def output_name(name):
+    # Keep only a plain file name, without directories or unusual characters
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", os.path.basename(name)).lstrip(".")
+    if not name:
+        return None
+    return name if name.endswith(".csv") else f"{name}.csv"
+
+
+# Check if a model has been published by the Model Training page
+if read_version() is not None:
+    st.title("Batch Predictions")
+    st.write("Predict the prices of a whole file of listings with the model published by the Model Training page. "
+             "The listings are cleaned and encoded like the training data, scored chunk by chunk and written "
+             "to the output file together with their predicted price.")
+
+    # The listings come either from an uploaded file or from a file on the server, e.g. a nightly feed
+    source_type = st.radio("Listings", ["Upload a file", "File on disk"], horizontal=True)
+    if source_type == "Upload a file":
+        source = st.file_uploader("Listings file", type=["csv", "parquet"])
+        default_name = os.path.splitext(source.name)[0] if source is not None else "listings"
+    else:
+        source = st.text_input(f"Path of the listings file, in the {DATA_DIR} directory", f"{DATA_DIR}/Quikr_car.csv") or None
+        default_name = os.path.splitext(os.path.basename(source))[0] if source else "listings"
+
+    out_name = output_name(st.text_input(f"Output file, written to the {OUTPUT_DIR} directory",
+                                         f"{default_name}_predictions.csv"))
+    chunk_rows = st.number_input("Rows per chunk", min_value=1_000, max_value=1_000_000, value=BATCH_ROWS, step=10_000)
+
+    if st.button("Predict prices", disabled=source is None or out_name is None):
+        out_path = os.path.join(OUTPUT_DIR, out_name)
+        if source_type == "File on disk" and not inside(DATA_DIR, source):
+            st.error(f"Only files in the {DATA_DIR} directory can be scored.")
+        elif source_type == "File on disk" and not os.path.isfile(source):
+            st.error(f"The file {source} does not exist.")
+        else:
+            # Report the number of rows scored after every chunk
+            status = st.empty()
+            def show_progress(rows):
+                status.write(f"Scored {rows:,} rows...")
+
+            rows, seconds = score_file(source, out_path, chunk_rows, progress=show_progress)
+            status.empty()
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Rows", f"{rows:,}")
+            col2.metric("Seconds", f"{seconds:.2f}")
+            col3.metric("Rows per second", f"{rows / seconds:,.0f}" if seconds else "-")
+            st.success(f"The predictions were written to {out_path}.")
+
+            # Preview of the first scored listings
+            st.dataframe(pd.read_csv(out_path, nrows=100))
+
+else:
+    # Error message if the model file is missing
+    st.error("Error: No model has been published yet. Please train a model on the Model Training page first.")
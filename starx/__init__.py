@@ -0,0 +1 @@
+"""Data and model helpers shared by the StarX Streamlit pages."""
@@ -0,0 +1,68 @@
+"""Frequency tables and overview charts of the categorical listing columns.
+
+All frequency tables of a dataset version are computed together, with one
+pass over each column, and the charts built from them are kept as Plotly
+JSON. Revisiting the statistics page therefore only deserializes the stored
+charts.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+from starx.fingerprint import frame_fingerprint
+from starx.memo import Memo
+
+
+# Column -> (chart title, fixed order of the bars or None to sort by count)
+OVERVIEW_CHARTS = {
+    'Label': ('Count of Labels', None),
+    'Location': ('Count of Cars by Locations', None),
+    'Fuel_type': ('Count of Cars by Fuel Type', None),
+    'Owner': ('Count of Cars by Owner', ['1st Owner', '2nd Owner', '3rd Owner']),
+    'Year': ('Count of Cars by Year', None),
+    'Company': ('Count of Cars by Company', None),
+}
+
+_tables = Memo()
+_figures = Memo()
+
+
+def value_counts(series):
+    """Return the counts of the distinct values of `series`, most frequent first.
+
+    Values are counted from their factorized codes, and string values that
+    only differ by surrounding whitespace are counted together.
+    """
+    codes, uniques = pd.factorize(series)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    labels = pd.Index(uniques)
+    if labels.dtype == object or isinstance(labels.dtype, pd.CategoricalDtype):
+        labels = labels.astype(str).str.strip()
+    counts = pd.Series(counts, index=labels).groupby(level=0, sort=False).sum()
+    return counts.sort_values(ascending=False, kind='stable')
+
+
+def frequency_tables(df, columns=tuple(OVERVIEW_CHARTS)):
+    """Return the memoized frequency table of every column in `columns`."""
+    def compute():
+        return {column: value_counts(df[column]) for column in columns}
+    return _tables.get_or_compute((frame_fingerprint(df), tuple(columns)), compute)
+
+
+def _build_figures(df):
+    figures = {}
+    tables = frequency_tables(df)
+    for column, (title, order) in OVERVIEW_CHARTS.items():
+        counts = tables[column]
+        if order is not None:
+            counts = counts.reindex(order)
+        table = counts.rename_axis(column).reset_index(name='Count')
+        figures[column] = px.bar(table, x=column, y='Count', title=title, text='Count').to_json()
+    return figures
+
+
+def overview_figures(df):
+    """Return the memoized overview charts of `df` as Plotly figures, keyed by column."""
+    figures = _figures.get_or_compute(frame_fingerprint(df), lambda: _build_figures(df))
+    return {column: pio.from_json(figure) for column, figure in figures.items()}
@@ -0,0 +1,108 @@
+"""Batch scoring of listing files with the published price model.
+
+A listings file (CSV, or a Parquet store written by `starx.ingest`) is read
+in chunks of bounded size. Every chunk goes through the same cleaning and
+category encoding as the training data and is one-hot encoded with the
+design the model was trained on, so each chunk is scored with a single
+sparse matrix product. The listings are written to the output CSV by Arrow's
+CSV writer as they are scored, together with their predicted price, so
+memory stays proportional to the chunk size rather than to the size of the
+file.
+
+Listings whose Kms_driven or Year cannot be read get an empty prediction.
+
+    python -m starx.batch data/Quikr_car.csv predictions/quikr.csv --chunksize 100000
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from starx.ingest import read_chunks
+from starx.persistence import MODEL_PATH, load_model
+from starx.transform import transform
+
+
+BATCH_ROWS = 100_000
+
+PREDICTION_COLUMN = 'Predicted_price'
+
+
+def read_listings(source, chunksize=BATCH_ROWS):
+    """Yield the listings of a CSV or Parquet file (a path or an open file) in chunks."""
+    name = getattr(source, 'name', source)
+    if str(name).endswith('.parquet'):
+        yield from read_chunks(source, batch_size=chunksize)
+    else:
+        # Read as text, so the listings are written back as they were and a column that is empty in one
+        # chunk does not get a different type than in the next
+        yield from pd.read_csv(source, chunksize=chunksize, dtype=str)
+
+
+def score_chunk(model, chunk):
+    """Return the predicted prices of a chunk of raw listings."""
+    design = model.design
+    df = transform(chunk[design.categorical + design.numeric], model.encoder)
+    # Values that cannot be read as numbers give missing values and so an empty prediction
+    for column in design.numeric:
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+    return np.round(model.predict(design.transform(df)), 2)
+
+
+def score_file(source, out_path, chunksize=BATCH_ROWS, model_path=MODEL_PATH, progress=None):
+    """Score the listings in `source` and write them with their predicted price to `out_path`.
+
+    The model is read once, so the whole file is scored by the same model
+    version even if a new one is published meanwhile. `progress` is called
+    with the number of rows scored so far after every chunk. Returns the
+    number of rows and the seconds it took.
+    """
+    model = load_model(model_path)
+    start = time.perf_counter()
+    rows = 0
+
+    # Write to a temporary file first so readers never see a partial output
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    writer = schema = None
+    try:
+        for chunk in read_listings(source, chunksize):
+            chunk[PREDICTION_COLUMN] = score_chunk(model, chunk)
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                # The listing columns are written as text whatever type a chunk inferred for them
+                schema = pa.schema([(column, pa.string()) for column in chunk.columns.drop(PREDICTION_COLUMN)]
+                                   + [(PREDICTION_COLUMN, pa.float64())])
+                writer = pa_csv.CSVWriter(tmp_path, schema)
+            writer.write_table(table.cast(schema))
+            rows += len(chunk)
+            if progress is not None:
+                progress(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        # An empty listings file gives an empty output
+        open(tmp_path, 'w').close()
+    os.replace(tmp_path, out_path)
+    return rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict the prices of a listings file with the published model.")
+    parser.add_argument('source', help="CSV file or Parquet store of listings")
+    parser.add_argument('out_path', help="CSV file the listings and their predicted price are written to")
+    parser.add_argument('--chunksize', type=int, default=BATCH_ROWS, help="rows scored per chunk")
+    parser.add_argument('--model', default=MODEL_PATH, help="published model to score with")
+    args = parser.parse_args()
+
+    rows, elapsed = score_file(args.source, args.out_path, args.chunksize, args.model)
+    print(f"Scored {rows:,} rows into {args.out_path} in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Sparse one-hot design matrices for the price models.
+
+Categorical columns hold the integer codes of the `CategoricalEncoder`. Each
+code seen while fitting becomes one indicator column (the first one is
+dropped as the reference level), and the numeric columns are appended,
+standardized with the mean and standard deviation seen while fitting, which
+keeps the coordinate-descent and iterative solvers well conditioned. Codes
+not seen while fitting get no indicator, like the reference level.
+The matrix is a scipy CSR matrix, so its memory and the fit time of sparse
+capable regressors grow with the number of non-zeros, not with rows times
+categories.
+"""
+import numpy as np
+from scipy import sparse
+
+
+CATEGORICAL_FEATURES = ['Location', 'Fuel_type', 'Owner', 'Company']
+NUMERIC_FEATURES = ['Kms_driven', 'Year']
+
+
+class DesignMatrix:
+    """One-hot encoding of categorical code columns followed by numeric columns."""
+
+    def __init__(self, categorical=CATEGORICAL_FEATURES, numeric=NUMERIC_FEATURES, drop_first=True):
+        self.categorical = list(categorical)
+        self.numeric = list(numeric)
+        self.drop_first = drop_first
+        self.categories = {}
+        self.numeric_mean = []
+        self.numeric_scale = []
+
+    def fit(self, df):
+        """Learn the codes of every categorical column of `df`."""
+        self.categories = {column: np.unique(df[column].to_numpy()).tolist() for column in self.categorical}
+        numeric = df[self.numeric].to_numpy(dtype='float64')
+        self.numeric_mean = numeric.mean(axis=0).tolist()
+        self.numeric_scale = [scale or 1.0 for scale in numeric.std(axis=0).tolist()]
+        self._build_lookup()
+        return self
+
+    def _build_lookup(self):
+        # Code -> matrix column for every categorical column; -1 means no indicator
+        self._lookup = {}
+        self.feature_names = []
+        for column, codes in self.categories.items():
+            kept = codes[1:] if self.drop_first else codes
+            lookup = np.full(max(codes, default=0) + 1, -1, dtype='int64')
+            lookup[kept] = np.arange(len(self.feature_names), len(self.feature_names) + len(kept))
+            self._lookup[column] = lookup
+            self.feature_names += [f"{column}_{code}" for code in kept]
+        self.feature_names += self.numeric
+
+    def indicator_columns(self, column):
+        """Return the matrix column of the indicator of every code of `column` that has one."""
+        lookup = self._lookup[column]
+        codes = np.flatnonzero(lookup >= 0)
+        return dict(zip(codes.tolist(), lookup[codes].tolist()))
+
+    def transform(self, df):
+        """Return the CSR design matrix of `df`."""
+        n = len(df)
+        rows, columns, values = [], [], []
+        for column in self.categorical:
+            codes = df[column].to_numpy(dtype='int64')
+            lookup = self._lookup[column]
+            index = np.full(n, -1, dtype='int64')
+            known = (codes >= 0) & (codes < len(lookup))
+            index[known] = lookup[codes[known]]
+            present = np.flatnonzero(index >= 0)
+            rows.append(present)
+            columns.append(index[present])
+            values.append(np.ones(len(present)))
+        offset = len(self.feature_names) - len(self.numeric)
+        for i, column in enumerate(self.numeric):
+            rows.append(np.arange(n))
+            columns.append(np.full(n, offset + i))
+            values.append((df[column].to_numpy(dtype='float64') - self.numeric_mean[i]) / self.numeric_scale[i])
+        matrix = sparse.csr_matrix(
+            (np.concatenate(values), (np.concatenate(rows), np.concatenate(columns))),
+            shape=(n, len(self.feature_names)))
+        matrix.eliminate_zeros()
+        return matrix
+
+    def to_dict(self):
+        """Return the fitted state as plain Python objects."""
+        return {'categorical': self.categorical, 'numeric': self.numeric, 'drop_first': self.drop_first,
+                'categories': self.categories, 'numeric_mean': self.numeric_mean,
+                'numeric_scale': self.numeric_scale}
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild a design saved with `to_dict`."""
+        design = cls(state['categorical'], state['numeric'], state['drop_first'])
+        design.categories = {column: list(codes) for column, codes in state['categories'].items()}
+        design.numeric_mean = list(state['numeric_mean'])
+        design.numeric_scale = list(state['numeric_scale'])
+        design._build_lookup()
+        return design
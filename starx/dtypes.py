@@ -0,0 +1,56 @@
+"""Downcasting of DataFrame columns to the smallest dtypes that hold their values."""
+import numpy as np
+import pandas as pd
+
+
+# Object columns with at most this share of distinct values are stored as categories
+CATEGORY_RATIO = 0.5
+
+# Range of the integers whole-number float columns are cast to
+INT64 = np.iinfo('int64')
+
+
+def frame_nbytes(df):
+    """Return the memory used by `df`, including the contents of object columns."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _optimize_column(series):
+    """Return `series` with the smallest dtype that represents every value exactly."""
+    if pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy()
+        # int64 holds [-2**63, 2**63); the upper bound itself rounds up to 2**63 as a float
+        in_range = not values.size or (float(INT64.min) <= values.min() and values.max() < -float(INT64.min))
+        if not np.isnan(values).any() and np.array_equal(values, np.round(values)) and in_range:
+            # Whole numbers without missing values, e.g. codes that went through fillna
+            return pd.to_numeric(series.astype('int64'), downcast='integer')
+        if np.array_equal(values.astype('float32'), values, equal_nan=True):
+            return series.astype('float32')
+        return series
+
+    if series.dtype == object and len(series) and series.nunique() <= CATEGORY_RATIO * len(series):
+        return series.astype('category')
+
+    return series
+
+
+def optimize_dtypes(df):
+    """Return a copy of `df` with every column downcast to its smallest safe dtype."""
+    return pd.DataFrame({column: _optimize_column(df[column]) for column in df.columns}, index=df.index)
+
+
+def dtype_report(before, after):
+    """Return the dtype and memory of every column before and after optimization."""
+    report = pd.DataFrame({
+        'dtype before': before.dtypes.astype(str),
+        'dtype after': after.dtypes.astype(str),
+        'KB before': before.memory_usage(index=False, deep=True) / 1e3,
+        'KB after': after.memory_usage(index=False, deep=True) / 1e3,
+    })
+    return report
@@ -0,0 +1,109 @@
+"""Learned encoding of the categorical listing columns.
+
+The encoder learns the vocabulary of every categorical column from the data
+and stores each column as compact integer codes. Known values get the codes
+1..K, ordered by frequency (or alphabetically for ordinal columns such as
+Owner), and code 0 is reserved for missing values and values not seen during
+fitting. The same fitted encoder is saved with the models so that training
+and prediction share one lookup table.
+"""
+import numpy as np
+import pandas as pd
+
+
+CATEGORICAL_COLUMNS = ['Label', 'Location', 'Fuel_type', 'Owner', 'Company']
+
+# Columns whose values have a natural order that sorts alphabetically ('1st Owner' < '2nd Owner')
+ORDINAL_COLUMNS = ['Owner']
+
+UNKNOWN = 0
+
+
+def _code_dtype(size):
+    """Return the smallest integer dtype that holds the codes 0..size."""
+    for dtype in ('int8', 'int16', 'int32'):
+        if size <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype('int64')
+
+
+class CategoricalEncoder:
+    """Encodes categorical string columns as integer codes learned from the data."""
+
+    def __init__(self, columns=CATEGORICAL_COLUMNS, ordinal=ORDINAL_COLUMNS):
+        self.columns = list(columns)
+        self.ordinal = list(ordinal)
+        self.vocabulary = {}
+        self._lookup = {}
+
+    def fit(self, df):
+        """Learn the vocabulary of every categorical column present in `df`."""
+        self.vocabulary = {}
+        for column in self.columns:
+            if column not in df:
+                continue
+            # Count the distinct raw values, then merge the ones that only differ by whitespace
+            codes, uniques = pd.factorize(df[column])
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            stripped = pd.Index(uniques).astype(str).str.strip()
+            counts = pd.Series(counts, index=stripped).groupby(level=0, sort=False).sum()
+            if column in self.ordinal:
+                values = sorted(counts.index)
+            else:
+                # Most frequent first, ties keep the order of first appearance
+                values = list(counts.sort_values(ascending=False, kind='stable').index)
+            self.vocabulary[column] = values
+        self._build_lookup()
+        return self
+
+    def _build_lookup(self):
+        self._lookup = {
+            column: {value: code for code, value in enumerate(values, start=1)}
+            for column, values in self.vocabulary.items()
+        }
+
+    def dtype(self, column):
+        """Return the dtype used for the codes of `column`."""
+        return _code_dtype(len(self.vocabulary[column]))
+
+    def encode(self, column, values):
+        """Return the codes of `values`; missing and unseen values become 0."""
+        codes, uniques = pd.factorize(pd.Series(values, copy=False))
+        # Look up each distinct value once, then broadcast the codes back to the rows
+        lookup = self._lookup[column]
+        unique_codes = [lookup.get(str(value).strip(), UNKNOWN) for value in uniques]
+        table = np.array(unique_codes + [UNKNOWN], dtype=self.dtype(column))
+        return table[codes]
+
+    def encode_value(self, column, value):
+        """Return the code of a single value."""
+        return self._lookup[column].get(str(value).strip(), UNKNOWN)
+
+    def decode(self, column, codes):
+        """Return the values of `codes`; code 0 becomes None."""
+        table = np.array([None] + list(self.vocabulary[column]), dtype=object)
+        return table[np.asarray(codes, dtype='int64')]
+
+    def transform(self, df):
+        """Return a copy of `df` with the categorical columns replaced by their codes."""
+        df = df.copy(deep=False)
+        for column in self.vocabulary:
+            if column in df:
+                df[column] = self.encode(column, df[column])
+        return df
+
+    def to_categorical(self, column, codes):
+        """Return codes as a pd.Categorical of the learned values (code 0 becomes NaN)."""
+        return pd.Categorical.from_codes(np.asarray(codes, dtype='int64') - 1, self.vocabulary[column])
+
+    def to_dict(self):
+        """Return the fitted state as plain Python objects."""
+        return {'columns': self.columns, 'ordinal': self.ordinal, 'vocabulary': self.vocabulary}
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild an encoder saved with `to_dict`."""
+        encoder = cls(state['columns'], state['ordinal'])
+        encoder.vocabulary = {column: list(values) for column, values in state['vocabulary'].items()}
+        encoder._build_lookup()
+        return encoder
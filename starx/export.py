@@ -0,0 +1,90 @@
+"""Headless export of large synthetic datasets to Parquet shards.
+
+The rows are split into shards of a fixed size, and every shard gets its own
+child of one `SeedSequence`. Shards are written by a process pool, one Parquet
+file each. Because the seeds depend only on the seed and the shard layout,
+the output is the same for any number of workers.
+
+    python -m starx.export out/fake --rows 10000000 --method copula --seed 0
+"""
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from starx.encoding import CategoricalEncoder
+from starx.loader import DATA_PATH, load_dataset
+from starx.quantiles import cached_outlier_filter
+from starx.synth import GENERATORS
+from starx.transform import transform
+
+
+SHARD_ROWS = 1_000_000
+
+
+def shard_sizes(rows, shard_rows=SHARD_ROWS):
+    """Return the number of rows of every shard."""
+    full, rest = divmod(rows, shard_rows)
+    return [shard_rows] * full + ([rest] if rest else [])
+
+
+def _write_shard(generator, rows, seed_sequence, path):
+    df = generator.sample(rows, seed=seed_sequence)
+    # Write to a temporary file first so readers never see a partial shard
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return rows
+
+
+def export_shards(generator, rows, out_dir, shard_rows=SHARD_ROWS, seed=0, max_workers=None):
+    """Write `rows` samples of `generator` to `out_dir` as Parquet shards and return their paths."""
+    sizes = shard_sizes(rows, shard_rows)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(sizes))
+    paths = [os.path.join(out_dir, f"part-{i:05d}.parquet") for i in range(len(sizes))]
+
+    # Shards of an earlier export with more rows would otherwise be read as part of this one
+    os.makedirs(out_dir, exist_ok=True)
+    for stale_path in glob.glob(os.path.join(out_dir, "part-*.parquet")):
+        if stale_path not in paths:
+            os.remove(stale_path)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(_write_shard, [generator] * len(sizes), sizes, seed_sequences, paths))
+    return paths
+
+
+def fit_generator(method, path=DATA_PATH):
+    """Fit a generator of kind `method` on the processed listings at `path`."""
+    raw = load_dataset(path)
+    encoder = CategoricalEncoder().fit(raw)
+    df = transform(raw, encoder)
+    df = cached_outlier_filter(df).transform(df)
+    return GENERATORS[method]().fit(df, encoder)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate fake listings into Parquet shards.")
+    parser.add_argument('out_dir')
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--shard-rows', type=int, default=SHARD_ROWS, help="rows per shard")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--method', choices=sorted(GENERATORS), default='copula')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--path', default=DATA_PATH, help="listings the generator is fitted on")
+    args = parser.parse_args()
+
+    generator = fit_generator(args.method, args.path)
+
+    start = time.perf_counter()
+    paths = export_shards(generator, args.rows, args.out_dir, args.shard_rows, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {args.rows:,} rows in {len(paths)} shards to {args.out_dir} "
+          f"in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
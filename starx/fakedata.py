@@ -0,0 +1,49 @@
+"""Vectorized generation of random car listings.
+
+Every column is drawn at once with a `numpy.random.Generator`, so the cost is
+a handful of array operations whatever the number of rows. The same seed and
+row count always give the same frame.
+"""
+import numpy as np
+import pandas as pd
+
+
+# Columns of a generated listing, in the order of the processed data
+COLUMNS = ['Label', 'Location', 'Price', 'Kms_driven', 'Fuel_type', 'Owner', 'Year', 'Company']
+NUMERIC_COLUMNS = ['Price', 'Kms_driven', 'Year']
+
+# Smallest code drawn for categorical columns; code 0 (missing or unknown) is only drawn where it occurs
+CATEGORY_LOW = {'Label': 1, 'Fuel_type': 1}
+
+DEFAULT_ROWS = 500
+
+
+class UniformGenerator:
+    """Draw every column independently and uniformly between inclusive bounds."""
+
+    def __init__(self, bounds=None):
+        # Column -> (low, high), both inclusive
+        self.bounds = dict(bounds or {})
+
+    def fit(self, df, encoder):
+        """Take the numeric bounds from `df` and the category codes from `encoder`."""
+        self.bounds = {}
+        for column in COLUMNS:
+            if column in NUMERIC_COLUMNS:
+                self.bounds[column] = (int(df[column].min()), int(df[column].max()))
+            else:
+                self.bounds[column] = (CATEGORY_LOW.get(column, 0), len(encoder.vocabulary[column]))
+        return self
+
+    @property
+    def key(self):
+        """Hashable description of the generator, for caches."""
+        return ('uniform',) + tuple(sorted(self.bounds.items()))
+
+    def sample(self, rows=DEFAULT_ROWS, seed=None):
+        """Return `rows` random listings; `seed` is an int, a SeedSequence or a Generator."""
+        rng = np.random.default_rng(seed)
+        return pd.DataFrame({
+            column: rng.integers(low, high, size=rows, endpoint=True)
+            for column, (low, high) in self.bounds.items()
+        })
@@ -0,0 +1,42 @@
+"""Content fingerprints of DataFrames, used as dataset version keys."""
+import hashlib
+import threading
+import weakref
+
+import pandas as pd
+
+
+# Fingerprints of frames seen before, keyed by id() and checked through a weak reference
+_fingerprints = {}
+_lock = threading.Lock()
+
+
+def frame_fingerprint(df):
+    """Return a hex digest identifying the content of `df`.
+
+    The digest covers the values, index, column names and dtypes. It is
+    remembered for the lifetime of the frame, so frames must not be modified
+    in place after they have been fingerprinted.
+    """
+    cached = _fingerprints.get(id(df))
+    if cached is not None and cached[0]() is df:
+        return cached[1]
+
+    digest = hashlib.sha1()
+    digest.update(repr(list(zip(df.columns, map(str, df.dtypes)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    fingerprint = digest.hexdigest()
+    remember_fingerprint(df, fingerprint)
+    return fingerprint
+
+
+def remember_fingerprint(df, fingerprint):
+    """Record the fingerprint of `df`, e.g. of a copy of a frame whose fingerprint is known."""
+    key = id(df)
+    with _lock:
+        _fingerprints[key] = (weakref.ref(df, lambda _, key=key: _fingerprints.pop(key, None)), fingerprint)
+
+
+def value_fingerprint(*values):
+    """Return a hex digest identifying `values`, which must have a stable repr (strings, numbers, tuples)."""
+    return hashlib.sha1(repr(values).encode()).hexdigest()
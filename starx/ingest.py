@@ -0,0 +1,144 @@
+"""Streaming ingestion of large listing dumps into a Parquet store.
+
+The CSV is read in chunks of bounded size with explicit dtypes. Each chunk has
+its Price and Kms_driven columns cleaned and is appended to a Parquet file as
+its own row group, so peak memory stays proportional to the chunk size rather
+than to the size of the file.
+
+Usage::
+
+    python -m starx.ingest data/listings.csv data/listings.parquet --chunksize 500000
+"""
+import argparse
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from starx.transform import clean_kms, clean_price
+
+
+CATEGORY_COLUMNS = ['Label', 'Location', 'Fuel_type', 'Owner', 'Company']
+
+# dtypes used when reading the raw CSV
+CSV_DTYPES = {
+    'No': 'object',
+    'Name': 'object',
+    'Label': 'category',
+    'Location': 'category',
+    'Price': 'object',
+    'Kms_driven': 'object',
+    'Fuel_type': 'category',
+    'Owner': 'category',
+    'Year': 'object',
+    'Company': 'category',
+}
+
+# Integer columns, read as text and converted per chunk, so a missing or unreadable value becomes NA
+# instead of aborting the ingestion
+INTEGER_COLUMNS = {'No': 'Int64', 'Year': 'Int16'}
+
+# Arrow types of the columns in the Parquet store
+STORE_TYPES = {
+    'No': pa.int64(),
+    'Name': pa.string(),
+    'Label': pa.dictionary(pa.int32(), pa.string()),
+    'Location': pa.dictionary(pa.int32(), pa.string()),
+    'Price': pa.float64(),
+    'Kms_driven': pa.float64(),
+    'Fuel_type': pa.dictionary(pa.int32(), pa.string()),
+    'Owner': pa.dictionary(pa.int32(), pa.string()),
+    'Year': pa.int16(),
+    'Company': pa.dictionary(pa.int32(), pa.string()),
+}
+
+
+def strip_categories(series):
+    """Strip whitespace from the categories of a categorical series, merging duplicates."""
+    stripped = series.cat.categories.astype(str).str.strip()
+    categories = stripped.unique()
+    # Position of every old category in the new, deduplicated categories
+    remap = categories.get_indexer(stripped)
+    codes = series.cat.codes.to_numpy().copy()
+    # Missing values (-1) stay missing; a column without any value has no categories to look up
+    present = codes >= 0
+    codes[present] = remap[codes[present]]
+    return pd.Series(pd.Categorical.from_codes(codes, categories), index=series.index, name=series.name)
+
+
+def clean_chunk(chunk):
+    """Apply the per-row cleaning steps to one chunk of raw listings."""
+    if 'Price' in chunk:
+        chunk['Price'] = clean_price(chunk['Price']).astype('float64')
+    if 'Kms_driven' in chunk:
+        chunk['Kms_driven'] = clean_kms(chunk['Kms_driven']).astype('float64')
+    for column, dtype in INTEGER_COLUMNS.items():
+        if column in chunk:
+            chunk[column] = pd.to_numeric(chunk[column], errors='coerce').astype(dtype)
+    for column in CATEGORY_COLUMNS:
+        if column in chunk:
+            chunk[column] = strip_categories(chunk[column])
+    return chunk
+
+
+def ingest_csv(csv_path, store_path, chunksize=500_000, usecols=None):
+    """Stream the CSV at `csv_path` into the Parquet store at `store_path`.
+
+    Returns the number of rows written.
+    """
+    columns = usecols or list(CSV_DTYPES)
+    dtypes = {column: CSV_DTYPES[column] for column in columns if column in CSV_DTYPES}
+    schema = pa.schema([(column, STORE_TYPES[column]) for column in columns])
+
+    rows = 0
+    with pq.ParquetWriter(store_path, schema) as writer:
+        for chunk in pd.read_csv(csv_path, usecols=columns, dtype=dtypes, chunksize=chunksize):
+            chunk = clean_chunk(chunk[columns])
+            table = pa.Table.from_pandas(chunk, preserve_index=False).cast(schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    return rows
+
+
+def read_chunks(store_path, columns=None, batch_size=500_000):
+    """Yield the Parquet store at `store_path` as a sequence of DataFrames."""
+    store = pq.ParquetFile(store_path)
+    for batch in store.iter_batches(batch_size=batch_size, columns=columns):
+        yield batch.to_pandas()
+
+
+def check_clean_chunk():
+    """Check that chunks with empty or duplicated categories are cleaned without errors."""
+    chunk = pd.DataFrame({
+        'Owner': pd.Series([None, None], dtype='category'),
+        'Fuel_type': pd.Series([' Petrol', 'Petrol '], dtype='category'),
+    })
+    cleaned = clean_chunk(chunk)
+    assert cleaned['Owner'].isna().all() and len(cleaned['Owner'].cat.categories) == 0
+    assert list(cleaned['Fuel_type']) == ['Petrol', 'Petrol'] and list(cleaned['Fuel_type'].cat.categories) == ['Petrol']
+    print("clean_chunk handles empty and duplicated categories")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a listing CSV into a Parquet store chunk by chunk.")
+    parser.add_argument('csv_path', nargs='?')
+    parser.add_argument('store_path', nargs='?')
+    parser.add_argument('--chunksize', type=int, default=500_000, help="rows read per chunk")
+    parser.add_argument('--check', action='store_true', help="check the chunk cleaning instead of ingesting")
+    args = parser.parse_args()
+
+    if args.check:
+        check_clean_chunk()
+        return
+    if not (args.csv_path and args.store_path):
+        parser.error("csv_path and store_path are required")
+
+    start = time.perf_counter()
+    rows = ingest_csv(args.csv_path, args.store_path, chunksize=args.chunksize)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {rows:,} rows to {args.store_path} in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
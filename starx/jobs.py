@@ -0,0 +1,72 @@
+"""Background jobs on a process pool, so pages never block on fitting.
+
+Jobs are identified by a key (for trained models, their registry key). A job
+submitted while one with the same key is queued, running or finished is not
+started again, so identical requests from different sessions share one run.
+Pages submit their jobs, check whether they are done on every rerun, and
+pick up the results once they are.
+
+A worker that dies, e.g. killed for using too much memory, breaks the whole
+pool and fails all of its jobs. The next submit then starts a new pool, and
+the failed jobs are run again when they are submitted again.
+"""
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+# Seconds a page waits before it reruns to check on its jobs again
+POLL_SECONDS = 0.5
+
+
+class JobQueue:
+    """Process pool running deduplicated jobs; finished jobs are kept for later polls."""
+
+    def __init__(self, max_workers=None, size=64):
+        self.max_workers = max_workers
+        self.size = size
+        self._executor = None
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            # Workers are spawned, as forking the multi-threaded Streamlit server is not safe
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def submit(self, key, func, *args, **kwargs):
+        """Return the future of `func(*args, **kwargs)` run in a worker, unless a job with `key` already exists.
+
+        Jobs that failed are started again.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None or (future.done() and future.exception() is not None):
+                try:
+                    future = self._pool().submit(func, *args, **kwargs)
+                except BrokenProcessPool:
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = None
+                    future = self._pool().submit(func, *args, **kwargs)
+            self._futures[key] = future
+            self._futures.move_to_end(key)
+            # Forget the oldest finished jobs; jobs still running are always kept
+            for old_key in list(self._futures)[:max(0, len(self._futures) - self.size)]:
+                if self._futures[old_key].done():
+                    del self._futures[old_key]
+        return future
+
+    def status(self):
+        """Return the number of jobs per state: queued or running, finished, and failed."""
+        with self._lock:
+            futures = list(self._futures.values())
+        finished = [future for future in futures if future.done()]
+        failed = sum(future.exception() is not None for future in finished)
+        return {'Running': len(futures) - len(finished), 'Finished': len(finished) - failed, 'Failed': failed}
+
+
+JOBS = JobQueue()
@@ -0,0 +1,82 @@
+"""Cached loading of the listing CSV files.
+
+A CSV is parsed only once: the parsed frame is written to a Parquet file in
+the cache directory (named after the content hash of the CSV) and kept in a
+process-wide dictionary keyed by the file's path, mtime and size. Every
+Streamlit session and every rerun of the home page therefore shares a single
+frame, and loading it again costs an ``os.stat`` and a dictionary lookup.
+
+The returned frame is shared, so callers must not modify it in place.
+"""
+import glob
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+
+DATA_PATH = os.path.join('data', 'Quikr_car.csv')
+CACHE_DIR = os.path.join('data', '.cache')
+
+# Frames loaded in this process, keyed by (absolute path, mtime, size)
+_frames = {}
+_lock = threading.Lock()
+
+
+def file_digest(path, block_size=1 << 20):
+    """Return the SHA-1 hex digest of the content of a file."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_dataset(path=DATA_PATH, cache_dir=CACHE_DIR):
+    """Return the dataset stored in the CSV file at `path`.
+
+    The CSV is only parsed when neither this process nor the on-disk cache has
+    seen the current version of the file.
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    df = _frames.get(key)
+    if df is not None:
+        return df
+
+    with _lock:
+        # Another session may have loaded the file while we waited for the lock
+        df = _frames.get(key)
+        if df is None:
+            df = _read_through_cache(path, cache_dir)
+            # Forget the frames of older versions of the same file
+            for old_key in [k for k in _frames if k[0] == key[0]]:
+                del _frames[old_key]
+            _frames[key] = df
+    return df
+
+
+def _read_through_cache(path, cache_dir):
+    """Read the Parquet copy of the CSV at `path`, creating it if needed."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(cache_dir, f"{name}-{file_digest(path)[:16]}.parquet")
+
+    if os.path.exists(cache_path):
+        return pd.read_parquet(cache_path)
+
+    df = pd.read_csv(path)
+
+    # Write to a temporary file first so other processes never read a partial cache
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+
+    # Remove the caches of previous versions of the CSV
+    for stale_path in glob.glob(os.path.join(cache_dir, f"{name}-*.parquet")):
+        if stale_path != cache_path:
+            os.remove(stale_path)
+
+    return df
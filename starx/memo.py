@@ -0,0 +1,70 @@
+"""Small process-wide caches for results keyed by data fingerprints."""
+import threading
+import time
+from collections import OrderedDict
+
+
+class Memo:
+    """Thread-safe LRU cache of computed values, optionally expiring `ttl` seconds after they were stored.
+
+    `hits` and `misses` count the lookups that found a value and those that did not.
+    """
+
+    def __init__(self, size=8, ttl=None):
+        self.size = size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()  # key -> (expiry time or None, value)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def _lookup(self, key):
+        # Called with the lock held; returns whether the key was found and its value
+        item = self._items.get(key)
+        if item is not None:
+            expires, value = item
+            if expires is None or expires > time.monotonic():
+                self._items.move_to_end(key)
+                self.hits += 1
+                return True, value
+            del self._items[key]
+        self.misses += 1
+        return False, None
+
+    def _store(self, key, value):
+        # Called with the lock held
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        self._items[key] = (expires, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Return the value stored for `key`, calling `compute()` to create it on a miss."""
+        with self._lock:
+            found, value = self._lookup(key)
+        if found:
+            return value
+        # Computed outside the lock; concurrent misses for the same key simply compute twice
+        value = compute()
+        with self._lock:
+            self._store(key, value)
+        return value
+
+    def get(self, key, default=None):
+        """Return the value stored for `key`, or `default` when it is not cached."""
+        with self._lock:
+            found, value = self._lookup(key)
+        return value if found else default
+
+    def put(self, key, value):
+        """Store `value` for `key`, evicting the least recently used values beyond the size."""
+        with self._lock:
+            self._store(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
@@ -0,0 +1,161 @@
+"""Atomic, versioned storage of the published price model.
+
+The linear model the chatbot uses is stored in a compact coefficient format
+without any pickled objects: a magic string, the length of a JSON header
+(format, version, design layout, encoder vocabulary) and the header itself,
+followed by the intercept and coefficients as raw little-endian float64.
+Loading it is one read, one small JSON parse and `np.frombuffer`.
+
+The version of an artifact is a hash of its content, and every artifact is
+stored under its version (models/linear_model.<version>.bin). A small
+version file is the single pointer to the published one: publishing writes
+the artifact first and then replaces the pointer, so the version readers see
+always names the bytes they load, even with concurrent publishers. Readers
+check for a new model with a single tiny read of the pointer and keep using
+the loaded one otherwise. Publishing the same model again is skipped.
+
+Every file is written to a temporary file and renamed into place, so
+concurrent readers see either the old or the new file, never a partial one.
+"""
+import glob
+import hashlib
+import json
+import os
+import struct
+import threading
+
+import numpy as np
+
+from starx.design import DesignMatrix
+from starx.encoding import CategoricalEncoder
+
+
+MODEL_PATH = 'models/linear_model.bin'
+MAGIC = b'STARXLM'
+FORMAT_VERSION = 2
+
+# Artifacts of earlier versions kept on disk, for readers that are still loading them
+KEEP_VERSIONS = 4
+
+
+def atomic_write(path, data):
+    """Write `data` to a temporary file next to `path` and rename it into place."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as tmp_file:
+        tmp_file.write(data)
+    os.replace(tmp_path, path)
+
+
+def version_path(path=MODEL_PATH):
+    """Return the path of the version file of the model published at `path`."""
+    return os.path.splitext(path)[0] + '.version'
+
+
+def artifact_path(path, version):
+    """Return the path of the artifact of `version` of the model published at `path`."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{version}{ext}"
+
+
+class LinearArtifact:
+    """Coefficients of a fitted linear model with the design and encoder it was trained with."""
+
+    def __init__(self, coef, intercept, design, encoder, version):
+        self.coef = coef
+        self.intercept = intercept
+        self.design = design
+        self.encoder = encoder
+        self.version = version
+
+    @classmethod
+    def from_model(cls, model, design, encoder, version=None):
+        """Take the coefficients of a scikit-learn linear model fitted on `design`."""
+        return cls(np.asarray(model.coef_, dtype='float64'), float(model.intercept_), design, encoder, version)
+
+    def predict(self, X):
+        """Return the predictions for a (sparse) design matrix `X`."""
+        return X @ self.coef + self.intercept
+
+    def to_bytes(self):
+        header = json.dumps({'format': FORMAT_VERSION, 'version': self.version, 'design': self.design.to_dict(),
+                             'encoder': self.encoder.to_dict()}).encode()
+        values = np.concatenate([[self.intercept], self.coef]).astype('<f8')
+        return MAGIC + struct.pack('<I', len(header)) + header + values.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        if not data.startswith(MAGIC):
+            raise ValueError("Not a StarX model file")
+        start = len(MAGIC) + 4
+        header_size, = struct.unpack_from('<I', data, len(MAGIC))
+        header = json.loads(data[start:start + header_size])
+        if header['format'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported model format {header['format']}")
+        values = np.frombuffer(data, dtype='<f8', offset=start + header_size)
+        return cls(values[1:], float(values[0]), DesignMatrix.from_dict(header['design']),
+                   CategoricalEncoder.from_dict(header['encoder']), header['version'])
+
+
+def save_model(model, design, encoder, path=MODEL_PATH):
+    """Publish a linear model fitted on `design`, with its encoder, at `path` and return its version.
+
+    Nothing is written when the same model is already published.
+    """
+    artifact = LinearArtifact.from_model(model, design, encoder)
+    # The version is derived from the content, so it is the same in every process and session
+    artifact.version = hashlib.sha1(artifact.to_bytes()).hexdigest()[:16]
+    if read_version(path) != artifact.version:
+        # The artifact is in place before the pointer names it. It is written even if it exists, which makes
+        # it the newest artifact, so it is not removed as an old one meanwhile
+        atomic_write(artifact_path(path, artifact.version), artifact.to_bytes())
+        atomic_write(version_path(path), artifact.version.encode())
+        _remove_old_artifacts(path)
+    return artifact.version
+
+
+def _remove_old_artifacts(path):
+    root, ext = os.path.splitext(path)
+    artifacts = glob.glob(f"{glob.escape(root)}.*{ext}")
+    artifacts.sort(key=lambda artifact: os.path.getmtime(artifact) if os.path.exists(artifact) else 0, reverse=True)
+    current = artifact_path(path, read_version(path))
+    for old in [artifact for artifact in artifacts if artifact != current][KEEP_VERSIONS:]:
+        try:
+            os.remove(old)
+        except FileNotFoundError:
+            pass
+
+
+def read_version(path=MODEL_PATH):
+    """Return the version of the model published at `path`, or None if there is none."""
+    try:
+        with open(version_path(path), 'rb') as version_file:
+            return version_file.read().decode() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_model(path=MODEL_PATH, version=None):
+    """Read the model published at `path`, or the given `version` of it."""
+    version = version or read_version(path)
+    if version is None:
+        raise FileNotFoundError(f"No model has been published at {path}")
+    with open(artifact_path(path, version), 'rb') as model_file:
+        return LinearArtifact.from_bytes(model_file.read())
+
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def cached_model(path=MODEL_PATH):
+    """Return the published model, reading it again only when its version changed, or None."""
+    version = read_version(path)
+    if version is None:
+        return None
+    artifact = _loaded.get(path)
+    if artifact is None or artifact.version != version:
+        artifact = load_model(path, version)
+        with _lock:
+            _loaded[path] = artifact
+    return artifact
@@ -0,0 +1,102 @@
+"""Scatter plots that stay fast for large data.
+
+Below `SVG_MAX_POINTS` points a regular Plotly scatter is drawn. Up to
+`WEBGL_MAX_POINTS` the scatter is rendered with WebGL, and above that the
+points are binned on the server into a 2D histogram, so the browser receives
+a fixed-size grid instead of every point. Binned counts and samples are
+cached per dataset version.
+"""
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+from starx.fingerprint import frame_fingerprint
+from starx.memo import Memo
+
+
+SVG_MAX_POINTS = 5_000
+WEBGL_MAX_POINTS = 100_000
+
+# Default number of points kept by stratified sampling and of bins per axis
+SAMPLE_POINTS = 5_000
+BINS = 100
+
+_histograms = Memo(32)
+_samples = Memo(32)
+
+
+def _bin_edges(values, bins):
+    """Return histogram edges; integer data with few distinct values gets one bin per value."""
+    low, high = values.min(), values.max()
+    if np.issubdtype(values.dtype, np.integer) and high - low < bins:
+        return np.arange(low - 0.5, high + 1.5)
+    if low == high:
+        # A constant column would give identical edges, which histogram2d rejects
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, bins + 1)
+
+
+def binned_counts(df, x, y, bins=BINS):
+    """Return the memoized 2D histogram of `x` against `y` as (counts, x centres, y centres)."""
+    def compute():
+        data = df[[x, y]].dropna()
+        x_values, y_values = data[x].to_numpy(), data[y].to_numpy()
+        x_edges, y_edges = _bin_edges(x_values, bins), _bin_edges(y_values, bins)
+        counts, _, _ = np.histogram2d(x_values, y_values, bins=(x_edges, y_edges))
+        return counts, (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2
+    return _histograms.get_or_compute((frame_fingerprint(df), x, y, bins), compute)
+
+
+def stratified_sample(df, by, n=SAMPLE_POINTS, strata=50, seed=0):
+    """Return about `n` rows of `df`, drawn evenly from `strata` quantile bins of column `by`."""
+    if len(df) <= n:
+        return df
+
+    def compute():
+        values = df[by].to_numpy()
+        # Stratum of each row from its rank, so every stratum holds about the same number of rows
+        ranks = np.argsort(np.argsort(values, kind='stable'), kind='stable')
+        stratum = ranks * strata // len(values)
+        # Random order inside each stratum, then keep the first rows of every stratum
+        priority = np.random.default_rng(seed).random(len(values))
+        order = np.lexsort((priority, stratum))
+        position_in_stratum = np.arange(len(order)) - np.searchsorted(stratum[order], stratum[order])
+        keep = order[position_in_stratum < n / strata]
+        return np.sort(keep)
+    return df.iloc[_samples.get_or_compute((frame_fingerprint(df), by, n, strata, seed), compute)]
+
+
+def scatter(df, x, y, mode='auto', svg_max_points=SVG_MAX_POINTS, webgl_max_points=WEBGL_MAX_POINTS,
+            bins=BINS, title=None):
+    """Return a Plotly scatter of `y` against `x` suited to the size of `df`.
+
+    `mode` is one of 'auto', 'svg', 'webgl', 'sample' (stratified sample drawn
+    with WebGL) or 'density' (server-side 2D histogram).
+    """
+    if mode == 'auto':
+        if len(df) <= svg_max_points:
+            mode = 'svg'
+        elif len(df) <= webgl_max_points:
+            mode = 'webgl'
+        else:
+            mode = 'density'
+
+    if mode == 'svg':
+        return px.scatter(df, x=x, y=y, title=title)
+    if mode == 'webgl':
+        return px.scatter(df, x=x, y=y, title=title, render_mode='webgl')
+    if mode == 'sample':
+        sample = stratified_sample(df, x)
+        return px.scatter(sample, x=x, y=y, render_mode='webgl',
+                          title=title or f"Stratified sample of {len(sample):,} of {len(df):,} rows")
+
+    counts, x_centres, y_centres = binned_counts(df, x, y, bins)
+    # Empty bins are left transparent, and a log scale keeps sparse regions visible
+    z = np.where(counts.T > 0, np.log10(np.maximum(counts.T, 1)), np.nan)
+    figure = go.Figure(go.Heatmap(
+        x=x_centres, y=y_centres, z=z, customdata=counts.T, colorscale='Viridis',
+        colorbar={'title': 'log10(count)'},
+        hovertemplate=f"{x}: %{{x}}<br>{y}: %{{y}}<br>count: %{{customdata:,.0f}}<extra></extra>",
+    ))
+    figure.update_layout(title=title or f"Density of {len(df):,} rows", xaxis_title=x, yaxis_title=y)
+    return figure
@@ -0,0 +1,57 @@
+"""Process-wide cache of price predictions shared by all sessions.
+
+Users keep asking for the prices of the same listings, from the sidebar of
+the training pages and from the chatbot. Listings are normalized before they
+are looked up: Kms_driven is rounded to `kms_resolution` kilometres, so
+listings that only differ by a few kilometres share one entry, and the
+prediction is made for the normalized listing, so a cached price does not
+depend on which of those listings was asked for first. Keys include the
+version of the model, so publishing or training a new model never serves
+prices of the old one. Entries are evicted when least recently used and
+expire after `ttl` seconds.
+"""
+from starx.memo import Memo
+
+
+# Columns identifying a listing, in the order they appear in the cache keys
+LISTING_COLUMNS = ['Year', 'Kms_driven', 'Owner', 'Company', 'Fuel_type', 'Location']
+
+KMS_RESOLUTION = 1000
+CACHE_SIZE = 100_000
+TTL_SECONDS = 3600
+
+
+class PredictionCache:
+    """LRU cache of predictions with expiry, keyed by model version and normalized listing."""
+
+    def __init__(self, size=CACHE_SIZE, ttl=TTL_SECONDS, kms_resolution=KMS_RESOLUTION):
+        self.kms_resolution = kms_resolution
+        self._memo = Memo(size, ttl)
+
+    def normalize(self, listing):
+        """Return `listing` with plain integer values and Kms_driven rounded to the resolution."""
+        normalized = {column: int(listing[column]) for column in LISTING_COLUMNS}
+        if self.kms_resolution:
+            normalized['Kms_driven'] = round(normalized['Kms_driven'] / self.kms_resolution) * self.kms_resolution
+        return normalized
+
+    def get_or_predict(self, version, listing, predict):
+        """Return the cached price of `listing` for model `version`, calling `predict` on a miss.
+
+        `predict` is called with the normalized listing.
+        """
+        normalized = self.normalize(listing)
+        key = (version,) + tuple(normalized[column] for column in LISTING_COLUMNS)
+        return self._memo.get_or_compute(key, lambda: predict(normalized))
+
+    def stats(self):
+        """Return the number of hits, misses and cached predictions, and the hit rate."""
+        hits, misses = self._memo.hits, self._memo.misses
+        return {'Hits': hits, 'Misses': misses, 'Hit rate': hits / (hits + misses) if hits + misses else 0.0,
+                'Entries': len(self._memo)}
+
+    def clear(self):
+        self._memo.clear()
+
+
+PREDICTIONS = PredictionCache()
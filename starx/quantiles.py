@@ -0,0 +1,192 @@
+"""Streaming quantiles and the quantile-based outlier filter.
+
+`TDigest` is a mergeable t-digest sketch: values are added chunk by chunk, the
+sketch stays bounded in size, and sketches built by different workers over
+different partitions can be merged into one. While fewer values than the
+buffer size have been seen, the sketch stores them exactly and its quantiles
+equal those of pandas. The smallest and largest values are always kept
+exactly, so the 0 and 1 quantiles are the minimum and maximum.
+
+`OutlierFilter` uses one sketch per column to compute the upper thresholds
+of the configured percentiles in a single pass over chunked data.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from starx.fingerprint import frame_fingerprint
+from starx.memo import Memo
+
+
+# Column -> percentile above which rows are removed as outliers
+DEFAULT_PERCENTILES = {'Kms_driven': 0.99, 'Price': 0.98}
+
+
+class TDigest:
+    """Mergeable sketch of a numeric distribution for approximate quantiles."""
+
+    def __init__(self, compression=200, buffer_size=None):
+        self.compression = compression
+        # Values are kept exactly until there are more centroids than this
+        self.buffer_size = buffer_size or 20 * compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values):
+        """Add an array of values to the sketch (NaN values are ignored)."""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._add(values, np.ones(len(values)), values.min(), values.max())
+        return self
+
+    def merge(self, other):
+        """Add the centroids of another sketch to this one."""
+        if len(other.means):
+            self._add(other.means, other.weights, other.min, other.max)
+        return self
+
+    def _add(self, means, weights, low, high):
+        self.min = min(self.min, float(low))
+        self.max = max(self.max, float(high))
+        self.means = np.concatenate([self.means, means])
+        self.weights = np.concatenate([self.weights, weights])
+        if len(self.means) > self.buffer_size:
+            self._compress()
+
+    def _compress(self):
+        """Merge neighbouring centroids so that at most about `compression` remain."""
+        order = np.argsort(self.means, kind='stable')
+        means, weights = self.means[order], self.weights[order]
+        total = weights.sum()
+
+        # The k1 scale function keeps centroids small near the tails and larger in the middle
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = np.floor(self.compression * (np.arcsin(2 * q - 1) / np.pi + 0.5)).astype('int64')
+
+        # Centroids with the same k are merged into one
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(k)) + 1])
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q):
+        """Return the estimated `q` quantile (linear interpolation, as in pandas)."""
+        if not len(self.means):
+            return np.nan
+        order = np.argsort(self.means, kind='stable')
+        means, weights = self.means[order], self.weights[order]
+        # Rank of each centroid's centre; for single values this is 0, 1, ..., n - 1
+        centres = np.cumsum(weights) - weights / 2 - 0.5
+        # After compression the outermost centroids no longer sit at the extreme ranks, which hold min and max
+        last = weights.sum() - 1
+        if centres[0] > 0:
+            centres, means = np.concatenate([[0.0], centres]), np.concatenate([[self.min], means])
+        if centres[-1] < last:
+            centres, means = np.concatenate([centres, [last]]), np.concatenate([means, [self.max]])
+        return float(np.interp(q * last, centres, means))
+
+
+class OutlierFilter:
+    """Removes the rows above a per-column percentile, computed with streaming sketches."""
+
+    def __init__(self, percentiles=None, compression=200):
+        self.percentiles = dict(percentiles or DEFAULT_PERCENTILES)
+        self.compression = compression
+        self.sketches = {column: TDigest(compression) for column in self.percentiles}
+
+    def partial_fit(self, chunk):
+        """Add one chunk of rows to the sketches."""
+        for column, sketch in self.sketches.items():
+            sketch.update(chunk[column].to_numpy())
+        return self
+
+    def fit(self, data):
+        """Build the sketches from a DataFrame or from an iterable of DataFrame chunks."""
+        for chunk in [data] if isinstance(data, pd.DataFrame) else data:
+            self.partial_fit(chunk)
+        return self
+
+    def merge(self, other):
+        """Combine with a filter fitted on another partition of the data."""
+        for column, sketch in self.sketches.items():
+            sketch.merge(other.sketches[column])
+        return self
+
+    def thresholds(self):
+        """Return the upper threshold of every column."""
+        return {column: self.sketches[column].quantile(p) for column, p in self.percentiles.items()}
+
+    def transform(self, df):
+        """Return the rows of `df` that are not above any threshold."""
+        keep = np.ones(len(df), dtype=bool)
+        for column, threshold in self.thresholds().items():
+            keep &= (df[column] <= threshold).to_numpy()
+        return df[keep]
+
+    def transform_chunks(self, chunks):
+        """Filter an iterable of chunks, yielding the kept rows of each."""
+        thresholds = self.thresholds()
+        for chunk in chunks:
+            keep = np.ones(len(chunk), dtype=bool)
+            for column, threshold in thresholds.items():
+                keep &= (chunk[column] <= threshold).to_numpy()
+            yield chunk[keep]
+
+
+def sketch_store(store_path, percentiles=None, batch_size=500_000):
+    """Fit an `OutlierFilter` on a Parquet store, reading it batch by batch."""
+    from starx.ingest import read_chunks
+
+    outlier_filter = OutlierFilter(percentiles)
+    return outlier_filter.fit(read_chunks(store_path, columns=list(outlier_filter.percentiles), batch_size=batch_size))
+
+
+def fit_partitions(store_paths, percentiles=None, max_workers=None):
+    """Fit one `OutlierFilter` per Parquet partition in a process pool and merge them."""
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        filters = executor.map(sketch_store, store_paths, [percentiles] * len(store_paths))
+        return reduce(OutlierFilter.merge, filters)
+
+
+_fitted = Memo()
+
+
+def cached_outlier_filter(df, percentiles=None):
+    """Return an `OutlierFilter` fitted on `df`, memoized by data and percentiles."""
+    percentiles = dict(percentiles or DEFAULT_PERCENTILES)
+    key = (frame_fingerprint(df), tuple(sorted(percentiles.items())))
+    return _fitted.get_or_compute(key, lambda: OutlierFilter(percentiles).fit(df))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the t-digest against exact quantiles on chunked data.")
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--chunks', type=int, default=100, help="number of update() calls the rows are split into")
+    args = parser.parse_args()
+
+    values = np.random.default_rng(0).lognormal(size=args.rows)
+    sketch = TDigest()
+    for chunk in np.array_split(values, args.chunks):
+        sketch.update(chunk)
+
+    assert not np.isnan(sketch.means).any(), "the sketch has NaN centroids"
+    assert sketch.quantile(0.0) == values.min() and sketch.quantile(1.0) == values.max()
+    for q in (0.5, 0.9, 0.98, 0.99):
+        exact = np.quantile(values, q)
+        print(f"q={q:<5} exact {exact:10.4f}   sketch {sketch.quantile(q):10.4f}   "
+              f"relative error {abs(sketch.quantile(q) - exact) / exact:.2e}")
+    print(f"{len(sketch.means)} centroids for {args.rows:,} values in {args.chunks} chunks")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Registry of trained models, addressed by what they were trained on.
+
+A model's key is a digest of the data fingerprint, the feature list, the test
+split, the model name and its parameters. Fitted models are kept in memory
+and stored on disk as a versioned artifact directory per key:
+
+    models/registry/<key>/meta.json     what was trained, on what, and how well
+    models/registry/<key>/model.pkl     the fitted model
+
+Several sessions or processes asking for the same key share one artifact.
+The registry keeps at most `max_entries` artifacts on disk; storing a new
+one removes the oldest beyond that.
+"""
+import json
+import os
+import pickle
+import shutil
+import time
+
+from starx.fingerprint import value_fingerprint
+from starx.memo import Memo
+from starx.persistence import atomic_write
+
+
+REGISTRY_DIR = 'models/registry'
+
+# Artifacts kept on disk; e.g. every fake-data setting of page 08 trains its own models
+MAX_ENTRIES = 256
+
+
+def registry_key(data_version, features, test_size, model_name, params):
+    """Return the artifact key of a model; `params` is a hashable description of its parameters."""
+    return value_fingerprint(data_version, tuple(features), test_size, model_name, params)[:20]
+
+
+class ModelEntry:
+    """A fitted model with its metadata."""
+
+    def __init__(self, key, model, meta):
+        self.key = key
+        self.model = model
+        self.meta = meta
+
+
+class ModelRegistry:
+    """Fitted models cached in memory and stored on disk by key."""
+
+    def __init__(self, root=REGISTRY_DIR, size=32, max_entries=MAX_ENTRIES):
+        self.root = root
+        self.max_entries = max_entries
+        self._memory = Memo(size)
+
+    def _dir(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        """Return the entry stored under `key`, from memory or disk, or None."""
+        entry = self._memory.get(key)
+        if entry is None:
+            entry = self._load(key)
+            if entry is not None:
+                self._memory.put(key, entry)
+        return entry
+
+    def _load(self, key):
+        try:
+            with open(os.path.join(self._dir(key), 'meta.json')) as meta_file:
+                meta = json.load(meta_file)
+            with open(os.path.join(self._dir(key), 'model.pkl'), 'rb') as model_file:
+                model = pickle.load(model_file)
+        except FileNotFoundError:
+            return None
+        return ModelEntry(key, model, meta)
+
+    def put(self, key, model, meta):
+        """Store a fitted model under `key` and return its entry."""
+        entry = ModelEntry(key, model, dict(meta, key=key, created=time.time()))
+        # The model is renamed into place last, so a readable model always has its metadata
+        atomic_write(os.path.join(self._dir(key), 'meta.json'),
+                      json.dumps(entry.meta, indent=2, default=str).encode())
+        atomic_write(os.path.join(self._dir(key), 'model.pkl'), pickle.dumps(model))
+        self._memory.put(key, entry)
+        self.prune()
+        return entry
+
+    def prune(self):
+        """Remove the oldest artifacts from disk beyond `max_entries`."""
+        for meta in self.entries()[self.max_entries:]:
+            # A reader that loses the race finds no artifact and trains the model again
+            shutil.rmtree(self._dir(meta['key']), ignore_errors=True)
+
+    def entries(self):
+        """Return the metadata of every model stored on disk, newest first."""
+        metas = []
+        if os.path.isdir(self.root):
+            for key in os.listdir(self.root):
+                try:
+                    with open(os.path.join(self._dir(key), 'meta.json')) as meta_file:
+                        metas.append(json.load(meta_file))
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+        return sorted(metas, key=lambda meta: meta.get('created', 0), reverse=True)
+
+
+REGISTRY = ModelRegistry()
@@ -0,0 +1,83 @@
+"""Cross-validated comparison of regression models.
+
+Every model x fold fit, plus one fit of each model on all rows, is an
+independent task run on a joblib worker pool, so adding candidate models
+scales with the number of cores. Results are memoized by data fingerprint,
+features, target, folds and model parameters.
+"""
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
+from sklearn.model_selection import KFold
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from starx.fingerprint import frame_fingerprint
+from starx.memo import Memo
+
+
+def default_models():
+    """Return the candidate models of the algorithm selection page, each with standardized inputs."""
+    return {
+        'Ridge Regression': make_pipeline(StandardScaler(), Ridge(alpha=1.0)),
+        'Lasso Regression': make_pipeline(StandardScaler(), Lasso(alpha=0.1)),
+        'Linear Regression': make_pipeline(StandardScaler(), LinearRegression()),
+    }
+
+
+def model_key(estimator):
+    """Hashable description of an estimator and all its (nested) parameters."""
+    return (type(estimator).__name__,) + tuple(
+        (name, repr(value)) for name, value in sorted(estimator.get_params(deep=True).items()))
+
+
+def _fit(estimator, X, y, train, test):
+    """Fit a copy of `estimator` on the `train` rows and return it with its R² on the `test` rows."""
+    model = clone(estimator).fit(X[train], y[train])
+    return model, model.score(X[test], y[test])
+
+
+_comparisons = Memo(16)
+
+
+def comparison_key(df, features, target='Price', models=None, cv=5):
+    """Return the key identifying a comparison of `models` on `df`."""
+    models = models or default_models()
+    return ('compare_models', frame_fingerprint(df), tuple(features), target, cv,
+            tuple((name, model_key(model)) for name, model in models.items()))
+
+
+def compare_models(df, features, target='Price', models=None, cv=5, n_jobs=-1):
+    """Cross-validate `models` on `df` and return (scores table, models fitted on all rows).
+
+    The table has one row per model with its R² on all rows, the R² of every
+    fold and their mean. The folds are the unshuffled `KFold` splits that
+    `cross_val_score` uses for regressors.
+    """
+    models = models or default_models()
+    features = list(features)
+    key = comparison_key(df, features, target, models, cv)
+
+    def compute():
+        X = df[features].to_numpy(dtype='float64')
+        y = df[target].to_numpy(dtype='float64')
+        everything = np.arange(len(y))
+        splits = [(everything, everything)] + list(KFold(n_splits=cv).split(X))
+        tasks = [(name, split) for name in models for split in splits]
+
+        results = Parallel(n_jobs=n_jobs)(
+            delayed(_fit)(models[name], X, y, train, test) for name, (train, test) in tasks)
+
+        fitted = {}
+        rows = []
+        for i, name in enumerate(models):
+            model_results = results[i * len(splits):(i + 1) * len(splits)]
+            fitted[name] = model_results[0][0]
+            cv_scores = np.array([score for _, score in model_results[1:]])
+            rows.append({'Model': name, 'Score': model_results[0][1],
+                         'CV scores': cv_scores, 'Mean CV R²': cv_scores.mean()})
+        return pd.DataFrame(rows), fitted
+
+    return _comparisons.get_or_compute(key, compute)
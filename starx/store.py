@@ -0,0 +1,151 @@
+"""Process-wide store of the frames produced by the pipeline stages.
+
+Instead of every session keeping its own copy of every stage, sessions publish
+their frames here. Frames are deduplicated by content fingerprint, so all
+sessions working on the same dataset version share one frame per stage, and a
+frame is dropped once no session references it any more.
+
+Frames are downcast to their smallest safe dtypes when they enter the store,
+and the store keeps their memory before and after this step.
+
+Sessions must never see each other's changes, so the store only hands out
+frames that are isolated from the shared copy. With pandas copy-on-write
+enabled (the app enables it at start-up in main.py) these are shallow views
+that cost no memory until they are modified. Without it the store falls back
+to deep copies, which keep the isolation at the cost of the sharing.
+"""
+import threading
+
+import pandas as pd
+
+from starx.dtypes import frame_nbytes, optimize_dtypes
+from starx.fingerprint import frame_fingerprint, remember_fingerprint
+
+
+def _isolated(df):
+    """Return a copy of `df` that can be modified without affecting `df`, shallow under copy-on-write."""
+    return df.copy(deep=not pd.get_option('mode.copy_on_write'))
+
+
+class DatasetStore:
+    """Reference-counted, read-only store of DataFrames."""
+
+    def __init__(self, optimize=True):
+        self.optimize = optimize
+        self._frames = {}    # version -> shared DataFrame
+        self._content = {}   # version -> fingerprint of the shared (downcast) frame
+        self._nbytes = {}    # version -> memory used by the frame
+        self._raw_nbytes = {}  # version -> memory used by the frame as published
+        self._refs = {}      # version -> set of (session id, stage) holding it
+        self._sessions = {}  # session id -> {stage: version}
+        self._lock = threading.RLock()
+
+    def publish(self, session_id, stage, df):
+        """Make `df` the frame of `stage` for a session and return a view of the shared copy."""
+        version = frame_fingerprint(df)
+        with self._lock:
+            known = version in self._frames
+
+        if not known:
+            # Downcast outside the lock, so other sessions are not blocked meanwhile
+            # The stored frame must not share data with the caller's frame, which the caller may modify later
+            shared = _isolated(optimize_dtypes(df) if self.optimize else df)
+            raw_nbytes, nbytes = frame_nbytes(df), frame_nbytes(shared)
+            content = frame_fingerprint(shared)
+
+        with self._lock:
+            if version not in self._frames:
+                if known:
+                    # The frame was dropped while we were not holding the lock
+                    return self.publish(session_id, stage, df)
+                self._frames[version] = shared
+                self._content[version] = content
+                self._raw_nbytes[version] = raw_nbytes
+                self._nbytes[version] = nbytes
+                self._refs[version] = set()
+
+            stages = self._sessions.setdefault(session_id, {})
+            previous = stages.get(stage)
+            if previous != version:
+                stages[stage] = version
+                self._refs[version].add((session_id, stage))
+                if previous is not None:
+                    self._release(previous, session_id, stage)
+
+            return self._view(version)
+
+    def get(self, session_id, stage):
+        """Return a view of the frame a session published for `stage`, or None."""
+        with self._lock:
+            version = self._sessions.get(session_id, {}).get(stage)
+            if version is None:
+                return None
+            return self._view(version)
+
+    def _view(self, version):
+        # Every call hands out a new copy; it gets the fingerprint of the shared frame, so the memoized
+        # functions do not hash the same data again on every rerun
+        view = _isolated(self._frames[version])
+        remember_fingerprint(view, self._content[version])
+        return view
+
+    def release_session(self, session_id):
+        """Drop every reference held by a session, e.g. when it ends."""
+        with self._lock:
+            for stage, version in self._sessions.pop(session_id, {}).items():
+                self._release(version, session_id, stage)
+
+    def _release(self, version, session_id, stage):
+        refs = self._refs[version]
+        refs.discard((session_id, stage))
+        if not refs:
+            del self._frames[version], self._content[version], self._nbytes[version], self._raw_nbytes[version], self._refs[version]
+
+    def stage_report(self):
+        """Return one row per stored frame with its stage(s), size and number of sessions.
+
+        'MB before' is the size of the frame as published, 'MB' its size after
+        the dtypes were downcast.
+        """
+        with self._lock:
+            rows = []
+            for version, refs in self._refs.items():
+                df = self._frames[version]
+                rows.append({
+                    'Stage': ', '.join(sorted({stage for _, stage in refs})),
+                    'Version': version[:12],
+                    'Rows': len(df),
+                    'Columns': df.shape[1],
+                    'MB before': self._raw_nbytes[version] / 1e6,
+                    'MB': self._nbytes[version] / 1e6,
+                    'Sessions': len({session for session, _ in refs}),
+                })
+        return pd.DataFrame(rows, columns=['Stage', 'Version', 'Rows', 'Columns', 'MB before', 'MB', 'Sessions'])
+
+    def session_report(self):
+        """Return one row per session with the memory of the frames it references.
+
+        'Shared MB' counts every frame the session uses, while 'Own MB' only
+        counts the frames no other session uses.
+        """
+        with self._lock:
+            rows = []
+            for session_id, stages in self._sessions.items():
+                versions = set(stages.values())
+                own = [v for v in versions if {s for s, _ in self._refs[v]} == {session_id}]
+                rows.append({
+                    'Session': session_id[:8],
+                    'Stages': len(stages),
+                    'Shared MB': sum(self._nbytes[v] for v in versions) / 1e6,
+                    'Own MB': sum(self._nbytes[v] for v in own) / 1e6,
+                })
+        return pd.DataFrame(rows, columns=['Session', 'Stages', 'Shared MB', 'Own MB'])
+
+    def total_bytes(self):
+        """Return the memory used by all stored frames."""
+        with self._lock:
+            return sum(self._nbytes.values())
+
+
+# The store shared by all sessions of this process
+STORE = DatasetStore()
@@ -0,0 +1,142 @@
+"""Feature subset search for linear regression from per-fold Gram matrices.
+
+The sufficient statistics of every cross-validation fold (X'X, X'y and y'y
+with an intercept column) are computed in one pass over the rows. After that,
+the cross-validated R² of any feature subset follows from solving a small
+system per fold, so a candidate costs the same for a thousand or a million
+rows. Candidates of a search step are scored in parallel.
+"""
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.model_selection import KFold
+
+from starx.fingerprint import frame_fingerprint
+from starx.memo import Memo
+
+
+METHODS = ['forward', 'backward', 'exhaustive']
+# Exhaustive search is limited to this many candidate features (2^12 - 1 subsets)
+MAX_EXHAUSTIVE_FEATURES = 12
+TOP_SUBSETS = 10
+
+
+class GramFolds:
+    """Per-fold Gram matrices of standardized features with an intercept column."""
+
+    def __init__(self, X, y, cv=5):
+        X = np.asarray(X, dtype='float64')
+        y = np.asarray(y, dtype='float64')
+        # Standardizing keeps the normal equations well conditioned; R² does not depend on it
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        Z = np.column_stack([np.ones(len(X)), (X - X.mean(axis=0)) / scale])
+        y = (y - y.mean()) / (y.std() or 1.0)
+
+        self.test_gram, self.test_moments, self.test_yy, self.test_rows = [], [], [], []
+        for _, test in KFold(n_splits=cv).split(Z):
+            self.test_gram.append(Z[test].T @ Z[test])
+            self.test_moments.append(Z[test].T @ y[test])
+            self.test_yy.append(y[test] @ y[test])
+            self.test_rows.append(len(test))
+        self.gram = sum(self.test_gram)
+        self.moments = sum(self.test_moments)
+
+    def score(self, subset):
+        """Return the mean R² over the folds of OLS on the feature indices in `subset`."""
+        columns = [0] + [i + 1 for i in subset]
+        scores = []
+        for gram, moments, yy, rows in zip(self.test_gram, self.test_moments, self.test_yy, self.test_rows):
+            # The training statistics are those of all rows minus those of the test fold
+            train_gram = (self.gram - gram)[np.ix_(columns, columns)]
+            train_moments = (self.moments - moments)[columns]
+            coef = np.linalg.lstsq(train_gram, train_moments, rcond=None)[0]
+            gram, moments = gram[np.ix_(columns, columns)], moments[columns]
+            residual_sum = yy - 2 * coef @ moments + coef @ gram @ coef
+            # moments[0] is the sum of y over the test rows
+            total_sum = yy - moments[0] ** 2 / rows
+            scores.append(1 - residual_sum / total_sum)
+        return float(np.mean(scores))
+
+
+def _score_all(folds, subsets, n_jobs):
+    return Parallel(n_jobs=n_jobs, prefer='threads')(delayed(folds.score)(subset) for subset in subsets)
+
+
+def _forward(folds, n_features, max_size, n_jobs):
+    selected, steps, evaluated = (), [], 0
+    while len(selected) < max_size:
+        candidates = [selected + (i,) for i in range(n_features) if i not in selected]
+        scores = _score_all(folds, candidates, n_jobs)
+        evaluated += len(candidates)
+        best = int(np.argmax(scores))
+        selected = candidates[best]
+        steps.append((selected, scores[best]))
+    return steps, evaluated
+
+
+def _backward(folds, n_features, max_size, n_jobs):
+    selected = tuple(range(n_features))
+    steps, evaluated = [(selected, folds.score(selected))], 1
+    while len(selected) > 1:
+        candidates = [tuple(i for i in selected if i != removed) for removed in selected]
+        scores = _score_all(folds, candidates, n_jobs)
+        evaluated += len(candidates)
+        best = int(np.argmax(scores))
+        selected = candidates[best]
+        steps.append((selected, scores[best]))
+    return [step for step in steps if len(step[0]) <= max_size], evaluated
+
+
+def _exhaustive(folds, n_features, max_size, n_jobs):
+    if n_features > MAX_EXHAUSTIVE_FEATURES:
+        raise ValueError(f"Exhaustive search supports at most {MAX_EXHAUSTIVE_FEATURES} features, got {n_features}")
+    candidates = [subset for size in range(1, max_size + 1)
+                  for subset in itertools.combinations(range(n_features), size)]
+    scores = _score_all(folds, candidates, n_jobs)
+    best = np.argsort(scores)[::-1][:TOP_SUBSETS]
+    return [(candidates[i], scores[i]) for i in best], len(candidates)
+
+
+_SEARCHES = {'forward': _forward, 'backward': _backward, 'exhaustive': _exhaustive}
+_results = Memo(16)
+
+
+def subset_key(df, features, target='Price', method='forward', max_size=None, cv=5):
+    """Return the key identifying a subset search on `df`."""
+    max_size = min(max_size or len(features), len(features))
+    return ('subset_search', frame_fingerprint(df), tuple(features), target, method, max_size, cv)
+
+
+def subset_search(df, features, target='Price', method='forward', max_size=None, cv=5, n_jobs=-1):
+    """Search subsets of `features` by cross-validated R² of linear regression.
+
+    Returns a frame of the subsets found (one per step for stepwise methods,
+    the best ones for exhaustive search) and a dict with the number of
+    candidates scored and the time spent.
+    """
+    features = list(features)
+    max_size = min(max_size or len(features), len(features))
+
+    def compute():
+        start = time.perf_counter()
+        folds = GramFolds(df[features].to_numpy(dtype='float64'), df[target].to_numpy(dtype='float64'), cv)
+        precompute = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found, evaluated = _SEARCHES[method](folds, len(features), max_size, n_jobs)
+        search = time.perf_counter() - start
+
+        subsets = pd.DataFrame({
+            'Features': [", ".join(features[i] for i in subset) for subset, _ in found],
+            'Size': [len(subset) for subset, _ in found],
+            'Mean CV R²': [score for _, score in found],
+        })
+        stats = {'Candidates': evaluated, 'Precompute seconds': precompute,
+                 'Search seconds': search, 'Seconds per candidate': search / evaluated}
+        return subsets, stats
+
+    return _results.get_or_compute(subset_key(df, features, target, method, max_size, cv), compute)
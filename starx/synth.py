@@ -0,0 +1,110 @@
+"""Synthetic listings that follow the distributions of the real data.
+
+`CopulaGenerator` is a Gaussian copula. It keeps the empirical distribution of
+every column and the rank correlations between them (for example
+Year/Kms_driven/Price). Columns with few distinct values, such as the
+category codes and Year, are sampled from their empirical frequencies with an
+inverted CDF. Other columns are interpolated on a quantile grid. Sampling is
+done in batches of vectorized draws, so its cost grows linearly with the
+number of rows.
+"""
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+from scipy.stats import rankdata
+
+from starx.fakedata import COLUMNS, DEFAULT_ROWS, UniformGenerator
+from starx.fingerprint import frame_fingerprint
+from starx.memo import Memo
+
+
+# Columns with at most this many distinct values are sampled as discrete values
+MAX_LEVELS = 256
+# Number of points of the quantile grid of continuous columns
+QUANTILE_POINTS = 1025
+BATCH_ROWS = 1_000_000
+
+
+class CopulaGenerator:
+    """Sample listings from empirical marginals joined by a Gaussian copula."""
+
+    def __init__(self, columns=COLUMNS):
+        self.columns = list(columns)
+        self.marginals = {}
+        self.dtypes = {}
+        self.cholesky = None
+        self.version = None
+
+    def fit(self, df, encoder=None):
+        """Fit the marginals and the correlation of the normal scores of `df` (`encoder` is unused)."""
+        data = df[self.columns].dropna()
+        self.version = frame_fingerprint(data)
+        self.dtypes = data.dtypes.to_dict()
+        scores = np.empty((len(data), len(self.columns)))
+        for i, column in enumerate(self.columns):
+            values = data[column].to_numpy()
+            self.marginals[column] = self._fit_marginal(values)
+            # Normal scores of the mid ranks, so ties share one score
+            scores[:, i] = ndtri(rankdata(values) / (len(values) + 1))
+        correlation = np.corrcoef(scores, rowvar=False)
+        # A constant column has no correlation; it is independent of the others
+        correlation = np.nan_to_num(correlation)
+        np.fill_diagonal(correlation, 1.0)
+        self.cholesky = np.linalg.cholesky(_nearest_positive_definite(correlation))
+        return self
+
+    @staticmethod
+    def _fit_marginal(values):
+        levels, counts = np.unique(values, return_counts=True)
+        if len(levels) <= MAX_LEVELS:
+            return 'discrete', levels, np.cumsum(counts) / counts.sum()
+        probabilities = np.linspace(0, 1, QUANTILE_POINTS)
+        return 'continuous', np.quantile(values, probabilities), probabilities
+
+    @property
+    def key(self):
+        """Hashable description of the generator, for caches."""
+        return ('copula', self.version)
+
+    def _inverse(self, column, u):
+        kind, values, probabilities = self.marginals[column]
+        if kind == 'discrete':
+            index = np.searchsorted(probabilities, u, side='right')
+            return values[np.minimum(index, len(values) - 1)]
+        sample = np.interp(u, probabilities, values)
+        if np.issubdtype(self.dtypes[column], np.integer):
+            sample = np.rint(sample)
+        return sample
+
+    def sample(self, rows=DEFAULT_ROWS, seed=None):
+        """Return `rows` synthetic listings; `seed` is an int, a SeedSequence or a Generator."""
+        rng = np.random.default_rng(seed)
+        columns = {column: np.empty(rows, dtype=self.dtypes[column]) for column in self.columns}
+        for start in range(0, rows, BATCH_ROWS):
+            stop = min(start + BATCH_ROWS, rows)
+            u = ndtr(rng.standard_normal((stop - start, len(self.columns))) @ self.cholesky.T)
+            for i, column in enumerate(self.columns):
+                columns[column][start:stop] = self._inverse(column, u[:, i])
+        return pd.DataFrame(columns)
+
+
+def _nearest_positive_definite(matrix, epsilon=1e-10):
+    """Clip the eigenvalues of a symmetric matrix so its Cholesky factor exists."""
+    eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+    if eigenvalues.min() > epsilon:
+        return matrix
+    fixed = eigenvectors @ np.diag(np.maximum(eigenvalues, epsilon)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(scale, scale)
+
+
+GENERATORS = {'copula': CopulaGenerator, 'uniform': UniformGenerator}
+
+_generators = Memo(8)
+
+
+def cached_generator(method, df, encoder):
+    """Return the memoized generator of kind `method` fitted on `df`."""
+    vocabulary_sizes = tuple(len(values) for values in encoder.vocabulary.values())
+    key = (method, frame_fingerprint(df), vocabulary_sizes)
+    return _generators.get_or_compute(key, lambda: GENERATORS[method]().fit(df, encoder))
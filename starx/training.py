@@ -0,0 +1,156 @@
+"""Training of the price models shown on the model training pages.
+
+The linear models are fitted on a sparse one-hot design matrix of the
+listing features. The gradient boosting model takes the listing columns
+directly, with native categorical splits on the category codes. Models are
+trained in background jobs and stored in the model registry, so they are
+trained once per data version, design, test split and model parameters.
+Moving a prediction input only costs a predict call.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import train_test_split
+
+from starx.design import CATEGORICAL_FEATURES, NUMERIC_FEATURES, DesignMatrix
+from starx.fingerprint import frame_fingerprint
+from starx.jobs import JOBS
+from starx.memo import Memo
+from starx.registry import REGISTRY, registry_key
+from starx.selection import model_key
+
+
+# Columns of a listing the price models use
+FEATURES = ["Location", "Kms_driven", "Fuel_type", "Owner", "Year", "Company"]
+TARGET = "Price"
+RANDOM_STATE = 42
+
+
+def price_models():
+    """Return the price models of the model training pages by display name."""
+    return {
+        'Lasso Regression': Lasso(alpha=0.1, max_iter=10_000),
+        'Ridge Regression': Ridge(alpha=1.0),
+        'Linear Regression': LinearRegression(),
+    }
+
+
+# Columns split on as categories by gradient boosting; Owner is ordered and stays numeric
+BOOSTING_CATEGORICAL = ["Location", "Fuel_type", "Company"]
+# Single-row predictions timed to measure the predict latency of a model
+LATENCY_RUNS = 50
+
+
+def boosting_models():
+    """Return the gradient boosting price model by display name."""
+    return {
+        'Gradient Boosting': HistGradientBoostingRegressor(
+            categorical_features=BOOSTING_CATEGORICAL, early_stopping=True, max_iter=500,
+            validation_fraction=0.1, n_iter_no_change=10, random_state=RANDOM_STATE),
+    }
+
+
+# Registry description of the inputs the models are trained on: the sparse design or the listing columns
+INPUT_KEYS = {
+    'design': ('onehot-csr', tuple(CATEGORICAL_FEATURES), tuple(NUMERIC_FEATURES), 'drop_first', 'standardized'),
+    'frame': ('columns', tuple(FEATURES)),
+}
+
+
+def model_inputs(model):
+    """Return the kind of inputs `model` is trained on."""
+    return 'frame' if isinstance(model, HistGradientBoostingRegressor) else 'design'
+
+
+_designs = Memo(8)
+_splits = Memo(8)
+
+
+def fitted_design(df):
+    """Return the memoized `DesignMatrix` fitted on the categories of `df`."""
+    return _designs.get_or_compute(frame_fingerprint(df), lambda: DesignMatrix().fit(df))
+
+
+def model_input(df, inputs='design'):
+    """Return the model inputs of `df`: the CSR design matrix, or the listing columns for 'frame'."""
+    return df[FEATURES] if inputs == 'frame' else fitted_design(df).transform(df)
+
+
+def split_data(df, test_size, inputs='design'):
+    """Return the memoized (X_train, X_test, y_train, y_test) of `df` for a test fraction.
+
+    Both kinds of inputs are split into the same rows; y keeps the index of `df`.
+    """
+    def compute():
+        return train_test_split(model_input(df, inputs), df[TARGET], test_size=test_size,
+                                random_state=RANDOM_STATE)
+    return _splits.get_or_compute((frame_fingerprint(df), test_size, inputs), compute)
+
+
+def fit_and_score(model, X_train, X_test, y_train, y_test):
+    """Fit a copy of `model` and return it with its test MSE, fit time and single-row predict latency."""
+    start = time.perf_counter()
+    model = clone(model).fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    mse = mean_squared_error(y_test, model.predict(X_test))
+
+    row = X_test[:1]
+    latencies = []
+    for _ in range(LATENCY_RUNS):
+        start = time.perf_counter()
+        model.predict(row)
+        latencies.append(time.perf_counter() - start)
+
+    metrics = {'mse': float(mse), 'fit_seconds': fit_seconds, 'predict_seconds': float(np.median(latencies)),
+               'train_rows': X_train.shape[0], 'test_rows': X_test.shape[0]}
+    if getattr(model, 'n_iter_', None) is not None:
+        metrics['iterations'] = int(np.max(model.n_iter_))
+    return model, metrics
+
+
+def _registry_entry(df, test_size, name, model):
+    """Return the registry key and metadata of `model` trained on `df`."""
+    inputs = model_inputs(model)
+    data_version = frame_fingerprint(df)
+    key = registry_key(data_version, INPUT_KEYS[inputs], test_size, name, model_key(model))
+    meta = {'model': name, 'params': model.get_params(), 'features': FEATURES, 'inputs': INPUT_KEYS[inputs][0],
+            'test_size': test_size, 'data_version': data_version, 'rows': len(df)}
+    return key, meta
+
+
+def submit_price_models(df, test_size, models=None, registry=REGISTRY, queue=JOBS):
+    """Train the missing `models` on `df` as background jobs.
+
+    Returns the registry entries of the models that are ready and the names
+    of those still training. Finished jobs are stored in the registry by the
+    first caller that finds them done.
+    """
+    models = models or price_models()
+    entries, pending = {}, []
+    for name, model in models.items():
+        key, meta = _registry_entry(df, test_size, name, model)
+        entry = registry.get(key)
+        if entry is None:
+            future = queue.submit(key, fit_and_score, model, *split_data(df, test_size, model_inputs(model)))
+            if not future.done():
+                pending.append(name)
+                continue
+            fitted, metrics = future.result()
+            entry = registry.put(key, fitted, dict(meta, **metrics))
+        entries[name] = entry
+    return entries, pending
+
+
+def benchmark_table(entries):
+    """Return the test MSE, fit time and predict latency of trained registry entries."""
+    return pd.DataFrame([{
+        'Model': name,
+        'Test MSE': entry.meta['mse'],
+        'Fit time (ms)': entry.meta['fit_seconds'] * 1e3,
+        'Predict latency (µs)': entry.meta['predict_seconds'] * 1e6,
+    } for name, entry in entries.items()]).set_index('Model')
@@ -0,0 +1,127 @@
+"""Transformation of the raw Quikr listings into the numeric frame used by the models.
+
+`transform` cleans a raw frame in a single vectorized pass: string operations
+are applied once per distinct value instead of once per row, and the
+categorical columns are encoded as compact integer codes by a fitted
+`CategoricalEncoder`. `cached_transform` and `cached_summary` memoize their results by the
+fingerprint of the input, so reruns on unchanged data do no work.
+
+The functions do not depend on Streamlit and can be benchmarked directly::
+
+    python -m starx.transform --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from starx.encoding import CategoricalEncoder
+from starx.fingerprint import frame_fingerprint
+from starx.memo import Memo
+
+
+DROPPED_COLUMNS = ["No", "Name"]
+
+# Number of results kept by the memoized functions
+CACHE_SIZE = 8
+
+
+def _per_unique(series, func):
+    """Apply `func` to the distinct values of `series` and broadcast the result back to the rows."""
+    codes, uniques = pd.factorize(series)
+    values = np.asarray(func(pd.Series(uniques)), dtype='float64')
+    # Missing entries have code -1, which picks the NaN appended at the end
+    return np.append(values, np.nan)[codes]
+
+
+def clean_price(price):
+    """Convert price strings such as '₹3,80,000' to numbers ('Ask For Price' becomes NaN)."""
+    if pd.api.types.is_numeric_dtype(price):
+        return price
+    return pd.to_numeric(price.str.replace(r'[₹,]', '', regex=True), errors='coerce')
+
+
+def clean_kms(kms_driven):
+    """Convert distance strings such as '35,056 kms ' to numbers."""
+    if pd.api.types.is_numeric_dtype(kms_driven):
+        return kms_driven
+    return pd.to_numeric(kms_driven.str.replace(r'kms|,', '', regex=True), errors='coerce')
+
+
+def _as_int_if_complete(values):
+    """Return int64 values when nothing is missing, float64 otherwise."""
+    return values if np.isnan(values).any() else values.astype('int64')
+
+
+def transform(raw, encoder=None):
+    """Return the cleaned, numerically encoded version of a raw listings frame.
+
+    The categorical columns are encoded with `encoder`, which is fitted on
+    `raw` when not given.
+    """
+    if encoder is None:
+        encoder = CategoricalEncoder().fit(raw)
+
+    columns = {}
+    for column in raw.columns:
+        if column in DROPPED_COLUMNS:
+            continue
+        series = raw[column]
+        if column in encoder.vocabulary:
+            columns[column] = encoder.encode(column, series)
+        elif column == 'Price':
+            price = _per_unique(series, clean_price)
+            price = np.where(np.isnan(price), np.nanmedian(price), price)  # Fill NaN with median
+            columns[column] = price.astype('int64')
+        elif column == 'Kms_driven':
+            columns[column] = _as_int_if_complete(_per_unique(series, clean_kms))
+        else:
+            columns[column] = series.to_numpy()
+    return pd.DataFrame(columns, index=raw.index)
+
+
+_encoders = Memo(CACHE_SIZE)
+_transformed = Memo(CACHE_SIZE)
+_summaries = Memo(CACHE_SIZE)
+
+
+def cached_encoder(raw):
+    """Return the memoized encoder fitted on `raw`."""
+    return _encoders.get_or_compute(frame_fingerprint(raw), lambda: CategoricalEncoder().fit(raw))
+
+
+def cached_transform(raw):
+    """Memoized `transform`. The returned frame is shared and must not be modified."""
+    return _transformed.get_or_compute(frame_fingerprint(raw), lambda: transform(raw, cached_encoder(raw)))
+
+
+def cached_summary(df):
+    """Return the memoized `describe()` and correlation matrix of `df`."""
+    return _summaries.get_or_compute(frame_fingerprint(df), lambda: (df.describe(), df.corr()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the transformation of the listings data.")
+    parser.add_argument('--path', default='data/Quikr_car.csv')
+    parser.add_argument('--rows', type=int, default=1_000_000, help="number of rows to benchmark with")
+    args = parser.parse_args()
+
+    raw = pd.read_csv(args.path)
+    raw = raw.sample(n=args.rows, replace=True, random_state=0, ignore_index=True)
+
+    start = time.perf_counter()
+    transform(raw)
+    cold = time.perf_counter() - start
+
+    cached_transform(raw)
+    start = time.perf_counter()
+    cached_transform(raw)
+    warm = time.perf_counter() - start
+
+    print(f"transform: {args.rows:,} rows in {cold:.3f}s ({args.rows / cold:,.0f} rows/s)")
+    print(f"cached_transform hit: {warm * 1e6:,.0f}µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Streamlit helpers shared by the pages."""
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from starx.fingerprint import frame_fingerprint
+from starx.jobs import POLL_SECONDS
+from starx.memo import Memo
+from starx.store import STORE
+
+
+class _SessionHandle:
+    """Lives in the session state and releases the session's frames once it is garbage collected."""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        weakref.finalize(self, STORE.release_session, session_id)
+
+
+def session_id():
+    """Return the id of the current Streamlit session."""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else 'local'
+
+
+def share(stage, df):
+    """Publish `df` as the current session's frame for `stage` and return the shared view."""
+    sid = session_id()
+    if '_store_handle' not in st.session_state:
+        st.session_state['_store_handle'] = _SessionHandle(sid)
+    return STORE.publish(sid, stage, df)
+
+
+def wait_for_jobs(pending, done=0, action="Training"):
+    """Show the background jobs still running and rerun the page until they have finished."""
+    if not pending:
+        return
+    st.progress(done / (done + len(pending)), text=f"{action} {', '.join(pending)} in the background...")
+    time.sleep(POLL_SECONDS)
+    st.rerun()
+
+
+# Rows sent to the browser per page of a data grid
+PAGE_SIZE = 100
+
+_sort_orders = Memo(32)
+_filter_masks = Memo(32)
+
+
+def _sort_order(df, column, ascending):
+    """Return the memoized row positions of `df` sorted by `column`."""
+    def compute():
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(str)
+        order = np.argsort(values.to_numpy(), kind='stable')
+        return order if ascending else order[::-1]
+    return _sort_orders.get_or_compute((frame_fingerprint(df), column, ascending), compute)
+
+
+def _filter_mask(df, column, condition):
+    """Return the memoized boolean mask of the rows of `df` matching `condition`."""
+    def compute():
+        values = df[column]
+        if pd.api.types.is_numeric_dtype(values):
+            low, high = condition
+            return ((values >= low) & (values <= high)).to_numpy()
+        return values.astype(str).str.contains(condition, case=False, regex=False).to_numpy()
+    return _filter_masks.get_or_compute((frame_fingerprint(df), column, condition), compute)
+
+
+def data_grid(df, key, container=st, columns=None, page_size=PAGE_SIZE):
+    """Show `df` one page at a time.
+
+    Sorting, filtering and slicing happen on the server, so only the rows of
+    the visible page are serialized and sent to the browser. `columns`
+    restricts the displayed columns.
+    """
+    columns = list(columns) if columns is not None else list(df.columns)
+    positions = np.arange(len(df))
+
+    with container.expander("Sort and filter"):
+        sort_column = st.selectbox("Sort by", [None] + columns, key=f"{key}_sort")
+        descending = st.checkbox("Descending", key=f"{key}_descending")
+        filter_column = st.selectbox("Filter on", [None] + columns, key=f"{key}_filter")
+
+        if sort_column is not None:
+            positions = _sort_order(df, sort_column, not descending)
+
+        if filter_column is not None:
+            values = df[filter_column]
+            condition = None
+            if pd.api.types.is_numeric_dtype(values):
+                low = st.number_input("Minimum", value=float(values.min()), key=f"{key}_min")
+                high = st.number_input("Maximum", value=float(values.max()), key=f"{key}_max")
+                condition = (low, high)
+            else:
+                text = st.text_input("Contains", key=f"{key}_contains")
+                condition = text or None
+            if condition is not None:
+                mask = _filter_mask(df, filter_column, condition)
+                positions = positions[mask[positions]]
+
+    pages = max(1, -(-len(positions) // page_size))
+    page = container.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+    start = (min(page, pages) - 1) * page_size
+    window = positions[start:start + page_size]
+
+    container.dataframe(df.iloc[window][columns])
+    container.caption(f"Rows {start + 1 if len(window) else 0:,}–{start + len(window):,} of {len(positions):,}"
+                      + (f" (filtered from {len(df):,})" if len(positions) != len(df) else ""))